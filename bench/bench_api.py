@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the GitHub API layer against the local mock server: PR creation throughput
+(one repository at a time and on a worker pool, as the bulk action does) and the batched
+GraphQL PR status query, for fleets of 10 to 1000 repositories. Reports wall time,
+repositories per second and API calls per repository. Nothing leaves localhost.
+
+    python bench/bench_api.py --sizes 10,100,1000 --latency 0.02 --workers 4
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+
+# Allow importing the shared utils package when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.fleet import Fleet
+from utils.process import Process
+from utils.pr_status import PRStatus
+from utils.github_actions import GitHubActions
+from mock_ghe import MockGHE
+
+BRANCH = "bench/update-deps"
+
+def make_fleet(parent, size, base_url):
+    """
+    Create 'size' empty repositories whose origin points at the mock server.
+    """
+    def make_repo(repo_path):
+        Process.run(["git", "init", "-q", repo_path], check=True)
+        Process.run(["git", "config", "remote.origin.url", f"{base_url}/bench/{os.path.basename(repo_path)}.git"],
+                    cwd=repo_path, check=True)
+
+    repo_paths = [os.path.join(parent, f"repo-{index:04d}") for index in range(size)]
+    Fleet.run_parallel(repo_paths, make_repo)
+    return repo_paths
+
+def create_pr(repo_path):
+    return GitHubActions.create_pull_request_enterprise(repo_path, BRANCH, "Benchmark PR", "Created by bench_api.py", "token")
+
+def run_scenario(mock, name, repo_count, action, verbose=False, keep_pulls=False):
+    """
+    Run one scenario against a freshly reset mock and return its measurements.
+    """
+    mock.reset(keep_pulls)
+    output = io.StringIO()
+    started = time.monotonic()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        succeeded = action()
+    seconds = time.monotonic() - started
+
+    stats = mock.stats()
+    requests_made = stats["totals"].get("requests", 0)
+    return {
+        "scenario": name,
+        "repos": repo_count,
+        "succeeded": succeeded,
+        "seconds": round(seconds, 3),
+        "repos_per_second": round(repo_count / seconds, 1) if seconds else None,
+        "api_calls": requests_made,
+        "calls_per_repo": round(requests_made / repo_count, 2),
+        "errors_injected": stats["totals"].get("errors_injected", 0),
+        "rate_limited": stats["totals"].get("rate_limited", 0),
+        "calls": stats["calls"],
+    }
+
+def benchmark(sizes, workers, batch_size, serial_max, mock, verbose=False):
+    results = []
+    for size in sizes:
+        parent = tempfile.mkdtemp(prefix=f"bench-{size}-")
+        try:
+            repo_paths = make_fleet(parent, size, mock.url)
+            targets = [("bench", os.path.basename(path)) for path in repo_paths]
+
+            if size <= serial_max:
+                results.append(run_scenario(mock, "create PRs (serial)", size,
+                                            lambda: sum(1 for path in repo_paths if create_pr(path)), verbose))
+            results.append(run_scenario(mock, f"create PRs ({workers} workers)", size,
+                                        lambda: sum(1 for url in Fleet.run_parallel(repo_paths, create_pr, workers).values() if url),
+                                        verbose))
+
+            # Reports on the PRs the previous scenario created
+            results.append(run_scenario(mock, f"PR status (GraphQL, batch {batch_size})", size,
+                                        lambda: fetch_status(targets, batch_size), verbose, keep_pulls=True))
+        finally:
+            shutil.rmtree(parent, ignore_errors=True)
+    return results
+
+def fetch_status(targets, batch_size):
+    rows = PRStatus.fetch(targets, BRANCH, "token", batch_size)
+    return sum(1 for row in rows.values() if row["number"])
+
+def print_results(results):
+    print(f"\n{'Repos':<7} {'Scenario':<32} {'OK':<6} {'Wall':<9} {'Repos/s':<9} {'API calls':<10} {'Calls/repo':<11} {'Errors'}")
+    print(f"{'-'*7} {'-'*32} {'-'*6} {'-'*9} {'-'*9} {'-'*10} {'-'*11} {'-'*6}")
+    for row in results:
+        errors = row["errors_injected"] + row["rate_limited"]
+        print(f"{row['repos']:<7} {row['scenario']:<32} {row['succeeded']:<6} {row['seconds']:<9.2f} "
+              f"{row['repos_per_second'] or '-':<9} {row['api_calls']:<10} {row['calls_per_repo']:<11} {errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GitHub API layer against a local mock GitHub Enterprise server.')
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated fleet sizes (default: 10,100,1000)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent PR creations, as in the bulk action (default: 4)')
+    parser.add_argument('--batch-size', type=int, default=50, help='Repositories per GraphQL query (default: 50)')
+    parser.add_argument('--serial-max', type=int, default=100, help='Largest fleet to also run serially (default: 100)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds added to every API response (default: 0.02)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds per response, up to this much')
+    parser.add_argument('--rate-limit', type=int, default=100000, help='Requests per window for each resource (default: 100000)')
+    parser.add_argument('--rate-window', type=int, default=60, help='Seconds until a spent rate limit resets (default: 60)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API requests that fail (default: 0)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for jitter and error injection (default: 1)')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show the output of the actions being measured')
+    args = parser.parse_args()
+
+    mock = MockGHE(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit, rate_window=args.rate_window,
+                   error_rate=args.error_rate, seed=args.seed)
+    with mock:
+        GitHubActions.set_base_url(mock.url)
+        print(f"Mock GitHub Enterprise on {mock.url} (latency {args.latency}s, error rate {args.error_rate})")
+        sizes = [int(size) for size in args.sizes.split(",")]
+        results = benchmark(sizes, args.workers, args.batch_size, args.serial_max, mock, args.verbose)
+
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+        print(f"\nResults saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+A local mock of the GitHub Enterprise REST and GraphQL endpoints the tool uses, for benchmarks
+and load tests that must not touch the real instance. It listens on localhost only.
+
+    python bench/mock_ghe.py --port 8080 --latency 0.05 --error-rate 0.01
+    python main.py --github-url http://127.0.0.1:8080 --no-ssh-mux
+
+Every repository exists except those whose name starts with "missing". Call counts per endpoint
+are served at /_mock/stats, and POST /_mock/reset clears them along with all pull requests.
+"""
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+REST_ROUTES = [
+    ("GET", re.compile(r"^/api/v3/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)$"), "get_repo", "/repos/{owner}/{repo}"),
+    ("GET", re.compile(r"^/api/v3/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/pulls$"), "list_pulls", "/repos/{owner}/{repo}/pulls"),
+    ("POST", re.compile(r"^/api/v3/repos/(?P<owner>[^/]+)/(?P<repo>[^/]+)/pulls$"), "create_pull", "/repos/{owner}/{repo}/pulls"),
+    ("GET", re.compile(r"^/api/v3/orgs/(?P<org>[^/]+)$"), "get_org", "/orgs/{org}"),
+    ("GET", re.compile(r"^/api/v3/orgs/(?P<org>[^/]+)/repos$"), "list_org_repos", "/orgs/{org}/repos"),
+    ("GET", re.compile(r"^/api/v3/rate_limit$"), "get_rate_limit", "/rate_limit"),
+]
+
+GRAPHQL_REPOSITORY = re.compile(r'(\w+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\)')
+
+class MockGHE:
+    """
+    In-memory GitHub Enterprise: repositories, pull requests, per-resource rate limits,
+    artificial latency and injected errors. Run it with start()/stop() or as a context manager.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit=5000, rate_window=3600,
+                 error_rate=0.0, error_status=502, org_repos=100, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.org_repos = org_repos
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self.reset()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def reset(self, keep_pulls=False):
+        """
+        Forget every pull request (unless 'keep_pulls'), refill the rate limits and clear the call counters.
+        """
+        with self._lock:
+            if not keep_pulls:
+                self.pulls = {}
+                self.next_id = 1
+            self.calls = Counter()
+            self.totals = Counter()
+            self.buckets = {}
+
+    def stats(self):
+        with self._lock:
+            return {"calls": dict(self.calls), "totals": dict(self.totals),
+                    "pull_requests": sum(len(pulls) for pulls in self.pulls.values())}
+
+    # Request pipeline
+
+    def _take_rate_limit(self, resource):
+        """
+        Spend one request from a resource's bucket. Returns (allowed, headers).
+        """
+        now = time.time()
+        with self._lock:
+            bucket = self.buckets.get(resource)
+            if bucket is None or now >= bucket["reset"]:
+                bucket = self.buckets[resource] = {"used": 0, "reset": int(now) + self.rate_window}
+            allowed = bucket["used"] < self.rate_limit
+            if allowed:
+                bucket["used"] += 1
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit - bucket["used"]),
+                "X-RateLimit-Used": str(bucket["used"]),
+                "X-RateLimit-Reset": str(bucket["reset"]),
+                "X-RateLimit-Resource": resource,
+            }
+        return allowed, headers
+
+    def handle(self, method, path, headers, body):
+        """
+        Answer one request. Returns (status, headers, JSON-serializable body or None).
+        """
+        parts = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        if parts.path == "/_mock/stats":
+            return 200, {}, self.stats()
+        if parts.path == "/_mock/reset" and method == "POST":
+            self.reset()
+            return 204, {}, None
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if parts.path == "/api/graphql" and method == "POST":
+            handler, endpoint, resource, params = self._graphql, "POST /graphql", "graphql", {}
+        else:
+            for route_method, pattern, name, endpoint in REST_ROUTES:
+                match = pattern.match(parts.path)
+                if match and route_method == method:
+                    handler, endpoint, resource, params = getattr(self, f"_{name}"), f"{method} {endpoint}", "core", match.groupdict()
+                    break
+            else:
+                with self._lock:
+                    self.totals["unknown"] += 1
+                return 404, {}, {"message": "Not Found"}
+
+        with self._lock:
+            self.calls[endpoint] += 1
+            self.totals["requests"] += 1
+            inject_error = self.error_rate and self._random.random() < self.error_rate
+            if inject_error:
+                self.totals["errors_injected"] += 1
+        if inject_error:
+            return self.error_status, {}, {"message": "Injected error"}
+
+        base_url = f"http://{headers.get('Host') or f'{self.host}:{self.port}'}"
+        if method == "GET":
+            # Reads have no side effects, so they can be answered with 304 before spending rate limit
+            status, response_headers, response = handler(base_url, params, query, body)
+            etag = f'"{hashlib.sha1(json.dumps(response, sort_keys=True).encode()).hexdigest()}"'
+            response_headers["ETag"] = etag
+            if status == 200 and headers.get("If-None-Match") == etag:
+                with self._lock:
+                    self.totals["not_modified"] += 1
+                return 304, response_headers, None
+            allowed, rate_headers = self._take_rate_limit(resource)
+        else:
+            allowed, rate_headers = self._take_rate_limit(resource)
+            if allowed:
+                status, response_headers, response = handler(base_url, params, query, body)
+
+        if not allowed:
+            with self._lock:
+                self.totals["rate_limited"] += 1
+            return 403, rate_headers, {"message": "API rate limit exceeded for user."}
+        response_headers.update(rate_headers)
+        return status, response_headers, response
+
+    # Resources
+
+    def _repository(self, base_url, owner, repo):
+        api_url = f"{base_url}/api/v3"
+        return {
+            "id": zlib.crc32(f"{owner}/{repo}".encode()), "name": repo, "full_name": f"{owner}/{repo}", "owner": {"login": owner},
+            "url": f"{api_url}/repos/{owner}/{repo}", "html_url": f"{base_url}/{owner}/{repo}",
+            "clone_url": f"{base_url}/{owner}/{repo}.git", "ssh_url": f"git@{urlsplit(base_url).hostname}:{owner}/{repo}.git",
+            "default_branch": "master", "archived": False, "private": True,
+        }
+
+    def _pull(self, base_url, owner, repo, pr):
+        return {
+            "id": pr["id"], "number": pr["number"], "state": pr["state"], "title": pr["title"], "body": pr["body"],
+            "draft": False, "user": {"login": "mock"},
+            "url": f"{base_url}/api/v3/repos/{owner}/{repo}/pulls/{pr['number']}",
+            "html_url": f"{base_url}/{owner}/{repo}/pull/{pr['number']}",
+            "head": {"ref": pr["head"], "label": f"{owner}:{pr['head']}"},
+            "base": {"ref": pr["base"], "label": f"{owner}:{pr['base']}"},
+        }
+
+    def _get_repo(self, base_url, params, query, body):
+        if params["repo"].startswith("missing"):
+            return 404, {}, {"message": "Not Found"}
+        return 200, {}, self._repository(base_url, params["owner"], params["repo"])
+
+    def _list_pulls(self, base_url, params, query, body):
+        owner, repo = params["owner"], params["repo"]
+        with self._lock:
+            pulls = list(self.pulls.get((owner, repo), []))
+        head = query.get("head", "").split(":")[-1]
+        state = query.get("state", "open")
+        pulls = [pr for pr in pulls if (not head or pr["head"] == head) and (state == "all" or pr["state"] == state)]
+        return 200, {}, [self._pull(base_url, owner, repo, pr) for pr in pulls]
+
+    def _create_pull(self, base_url, params, query, body):
+        owner, repo = params["owner"], params["repo"]
+        if repo.startswith("missing"):
+            return 404, {}, {"message": "Not Found"}
+        payload = json.loads(body or b"{}")
+        with self._lock:
+            pulls = self.pulls.setdefault((owner, repo), [])
+            if any(pr["head"] == payload.get("head") and pr["state"] == "open" for pr in pulls):
+                return 422, {}, {"message": "Validation Failed", "errors": [{
+                    "resource": "PullRequest", "code": "custom",
+                    "message": f"A pull request already exists for {owner}:{payload.get('head')}."}]}
+            pr = {"id": self.next_id, "number": len(pulls) + 1, "state": "open", "title": payload.get("title"),
+                  "body": payload.get("body"), "head": payload.get("head"), "base": payload.get("base")}
+            self.next_id += 1
+            pulls.append(pr)
+        return 201, {}, self._pull(base_url, owner, repo, pr)
+
+    def _get_org(self, base_url, params, query, body):
+        org = params["org"]
+        return 200, {}, {"login": org, "id": zlib.crc32(org.encode()), "url": f"{base_url}/api/v3/orgs/{org}",
+                         "repos_url": f"{base_url}/api/v3/orgs/{org}/repos", "public_repos": self.org_repos}
+
+    def _list_org_repos(self, base_url, params, query, body):
+        per_page = min(int(query.get("per_page", 30)), 100)
+        page = int(query.get("page", 1))
+        start = (page - 1) * per_page
+        names = [f"repo-{index:04d}" for index in range(start, min(start + per_page, self.org_repos))]
+        headers = {}
+        if start + per_page < self.org_repos:
+            next_url = f"{base_url}/api/v3/orgs/{params['org']}/repos?per_page={per_page}&page={page + 1}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return 200, headers, [self._repository(base_url, params["org"], name) for name in names]
+
+    def _get_rate_limit(self, base_url, params, query, body):
+        with self._lock:
+            resources = {resource: {"limit": self.rate_limit, "used": bucket["used"],
+                                    "remaining": self.rate_limit - bucket["used"], "reset": bucket["reset"]}
+                         for resource, bucket in self.buckets.items()}
+        return 200, {}, {"resources": resources, "rate": resources.get("core", {})}
+
+    def _graphql(self, base_url, params, query, body):
+        """
+        Answer the aliased 'repository { pullRequests(headRefName: $head) }' queries built by PRStatus.
+        """
+        payload = json.loads(body or b"{}")
+        head = payload.get("variables", {}).get("head")
+        data, errors = {}, []
+        for alias, owner, repo in GRAPHQL_REPOSITORY.findall(payload.get("query", "")):
+            owner, repo = json.loads(owner), json.loads(repo)
+            if repo.startswith("missing"):
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias],
+                               "message": f"Could not resolve to a Repository with the name '{owner}/{repo}'."})
+                continue
+            with self._lock:
+                pulls = [pr for pr in self.pulls.get((owner, repo), []) if pr["head"] == head]
+            nodes = [{
+                "number": pr["number"], "url": f"{base_url}/{owner}/{repo}/pull/{pr['number']}",
+                "state": pr["state"].upper(), "isDraft": False, "mergeable": "MERGEABLE",
+                "reviewDecision": "REVIEW_REQUIRED",
+                "commits": {"nodes": [{"commit": {"statusCheckRollup": {"state": "SUCCESS"}}}]},
+            } for pr in reversed(pulls[-1:])]
+            data[alias] = {"pullRequests": {"nodes": nodes}}
+        if "rateLimit" in payload.get("query", ""):
+            with self._lock:
+                bucket = self.buckets.get("graphql", {"used": 0})
+            data["rateLimit"] = {"cost": 1, "remaining": self.rate_limit - bucket["used"]}
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        return 200, {}, response
+
+    # Server
+
+    def _handler_class(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real server, so clients can reuse connections
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, response = mock.handle(self.command, self.path, self.headers, body)
+                data = json.dumps(response).encode() if response is not None else b""
+                self.send_response(status)
+                if data:
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """
+        Serve on a background thread. Returns the base URL to pass to GitHubActions.set_base_url.
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a mock GitHub Enterprise API on localhost.')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on (default: 8080)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every API response (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds, up to this much (default: 0)')
+    parser.add_argument('--rate-limit', type=int, default=5000, help='Requests per window for each resource (default: 5000)')
+    parser.add_argument('--rate-window', type=int, default=3600, help='Rate limit window in seconds (default: 3600)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API requests that fail (default: 0)')
+    parser.add_argument('--error-status', type=int, default=502, help='Status code of injected failures (default: 502)')
+    parser.add_argument('--org-repos', type=int, default=100, help='Repositories listed for every organization (default: 100)')
+    args = parser.parse_args()
+
+    mock = MockGHE(port=args.port, latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                   rate_window=args.rate_window, error_rate=args.error_rate, error_status=args.error_status,
+                   org_repos=args.org_repos)
+    url = mock.start()
+    print(f"Mock GitHub Enterprise listening on {url} (stats at {url}/_mock/stats)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+        print(json.dumps(mock.stats(), indent=2))
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,76 @@ import subprocess
 import sys
 import argparse
 
-def run_commands_in_subdirs(parent_dir):
+# Allow importing the shared utils package when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.profiling import Profiler
+from utils.pipeline import Pipeline, Stage
+from utils.process import Process, Cancelled
+from utils.run_history import RunHistory
+from utils.package_store import PackageStore
+
+def run_command(cmd, cwd):
+    """
+    Run a shell command in the given directory and print its output as one block,
+    so output from repositories running in parallel does not interleave.
+    """
+    lines = [f"\n[{cwd}] Executing: {cmd}"]
+    try:
+        process = Process.run(cmd, shell=True, check=False, text=True, cwd=cwd,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        # Print command output
+        if process.stdout:
+            lines.append("Output:")
+            lines.append(process.stdout)
+        
+        # Print any errors
+        if process.stderr:
+            lines.append("Errors:")
+            lines.append(process.stderr)
+        
+        if process.returncode != 0:
+            lines.append(f"Warning: Command exited with code {process.returncode}")
+        returncode = process.returncode
+    except (subprocess.TimeoutExpired, Cancelled) as e:
+        # Later commands depend on this one, so let the pipeline skip them
+        lines.append(f"Error: {e}")
+        print("\n".join(lines))
+        raise
+    except Exception as e:
+        lines.append(f"Error executing command: {e}")
+        returncode = None
+
+    print("\n".join(lines))
+    return returncode
+
+def install_from_store(store, cwd):
+    """
+    Install node_modules from the package store, printing the output as one block like run_command.
+    """
+    lines = [f"\n[{cwd}] Installing from the package store"]
+    try:
+        returncode, output = store.install_project(cwd)
+        lines.extend(output)
+        if returncode != 0:
+            lines.append(f"Warning: Install exited with code {returncode}")
+    except (subprocess.TimeoutExpired, Cancelled) as e:
+        lines.append(f"Error: {e}")
+        print("\n".join(lines))
+        raise
+    except Exception as e:
+        lines.append(f"Error installing from the store: {e}")
+        returncode = None
+
+    print("\n".join(lines))
+    return returncode
+
+def run_commands_in_subdirs(parent_dir, build_jobs=None, install_jobs=4, store=None):
     """
     Runs specified commands in each immediate subdirectory of the parent directory.
+    Subdirectories stream through the commands as pipeline stages, each with its own
+    concurrency limit, so one repository can build while another installs.
+    With a PackageStore, node_modules is hardlinked from the store instead of running npm install.
     """
     # Get all immediate subdirectories
     try:
@@ -19,58 +86,55 @@ def run_commands_in_subdirs(parent_dir):
         print(f"No subdirectories found in '{parent_dir}'.")
         return False
     
-    # Commands to run in each subdirectory
-    commands = [
-        "rm -rf node_modules package-lock.json",
-        "npm run build",
-        "npm install"
+    # Commands to run in each subdirectory, with the number of subdirectories allowed in each at once
+    build_jobs = build_jobs or os.cpu_count() or 1
+    stages = [
+        Stage("rm -rf node_modules package-lock.json",
+              lambda path: run_command("rm -rf node_modules package-lock.json", path), limit=8),
+        Stage("npm run build", lambda path: run_command("npm run build", path), limit=build_jobs),
+        Stage("npm install", lambda path: run_command("npm install", path), limit=install_jobs),
     ]
+    if store:
+        stages[-1] = Stage("npm install", lambda path: install_from_store(store, path), limit=install_jobs)
     
-    # Process each subdirectory
-    for subdir in subdirs:
-        full_path = os.path.join(parent_dir, subdir)
-        print(f"\n{'='*50}")
-        print(f"Processing directory: {full_path}")
-        print(f"{'='*50}")
-        
-        # Change to the subdirectory
-        original_dir = os.getcwd()
-        os.chdir(full_path)
-        
-        # Run each command
-        for cmd in commands:
-            print(f"\nExecuting: {cmd}")
-            try:
-                process = subprocess.run(cmd, shell=True, check=False, text=True, 
-                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                
-                # Print command output
-                if process.stdout:
-                    print("Output:")
-                    print(process.stdout)
-                
-                # Print any errors
-                if process.stderr:
-                    print("Errors:")
-                    print(process.stderr)
-                
-                if process.returncode != 0:
-                    print(f"Warning: Command exited with code {process.returncode}")
-            except Exception as e:
-                print(f"Error executing command: {e}")
-        
-        # Return to original directory
-        os.chdir(original_dir)
+    # Process each subdirectory, slowest first according to previous runs
+    history = RunHistory("cmd_run")
+    outcomes = Pipeline(stages).run([os.path.join(parent_dir, subdir) for subdir in subdirs], history)
+    history.print_summary()
+    if store:
+        store.print_summary()
+
+    timed_out = sorted(path for path, outcome in outcomes.items() if outcome["timed_out"])
+    cancelled = sorted(path for path, outcome in outcomes.items() if outcome["cancelled"])
+    if timed_out:
+        print(f"\nTimed out in {len(timed_out)} directories (retry these):")
+        for path in timed_out:
+            print(f"    {path}")
+    if cancelled:
+        print(f"\nCancelled before finishing in {len(cancelled)} directories.")
     
     return True
 
 def main():
     parser = argparse.ArgumentParser(description='Run Node.js commands in all subdirectories of a specified directory.')
     parser.add_argument('--directory', help='Parent directory containing subdirectories to process')
+    parser.add_argument('--build-jobs', type=int, help='Number of builds to run at once (default: CPU count)')
+    parser.add_argument('--install-jobs', type=int, default=4, help='Number of npm installs to run at once (default: 4)')
+    parser.add_argument('--timeout', action='append', metavar='STEP=SECONDS',
+                        help='Per-step timeout, e.g. npm=900 or default=600 (repeatable)')
+    parser.add_argument('--profile', metavar='OUTPUT', help='Sample the run and write collapsed stacks to OUTPUT')
+    parser.add_argument('--store', action='store_true',
+                        help='Install node_modules by hardlinking from the shared package store instead of npm install')
     args = parser.parse_args()
+    Process.configure(args.timeout)
+    store = PackageStore() if args.store else None
     
     print(f"Starting to process subdirectories in '{args.directory}'")
-    success = run_commands_in_subdirs(args.directory)
+    if args.profile:
+        with Profiler(args.profile):
+            success = run_commands_in_subdirs(args.directory, args.build_jobs, args.install_jobs, store)
+    else:
+        success = run_commands_in_subdirs(args.directory, args.build_jobs, args.install_jobs, store)
     
     if success:
         print("\nAll directories processed.")
@@ -79,4 +143,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
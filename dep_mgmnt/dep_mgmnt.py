@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import os
+import sys
+import argparse
+
+# Allow importing the shared utils package when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.dependency_mgmnt import Dependency_MGMNT
+from utils.profiling import Profiler
+from utils.process import Process
+from utils.package_store import PackageStore
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage NPM dependencies across all subdirectories of a specified directory.')
+    parser.add_argument('--directory', required=True, help='Parent directory containing the repositories to process')
+    parser.add_argument('--timeout', action='append', metavar='STEP=SECONDS',
+                        help='Per-step timeout, e.g. npm=900 or git=120 (repeatable)')
+    parser.add_argument('--profile', metavar='OUTPUT', help='Sample the run and write collapsed stacks to OUTPUT')
+    parser.add_argument('--store', action='store_true',
+                        help='Install node_modules by hardlinking from the shared package store instead of npm install')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+    subparsers.add_parser('discard-non-package-changes', help='Discard every change except package.json and package-lock.json')
+    remove_parser = subparsers.add_parser('remove-dep', help='Remove a dependency from every project that declares it')
+    remove_parser.add_argument('dependency', help='Name of the NPM dependency to remove')
+    remove_parser.add_argument('--lockfile-only', action='store_true',
+                               help='Edit package.json and regenerate only package-lock.json instead of reinstalling and building')
+    remove_parser.add_argument('--build', action='store_true', help='With --lockfile-only, also install and run the build as a check')
+    remove_parser.add_argument('--jobs', type=int, default=8, help='With --lockfile-only, number of projects to update at once (default: 8)')
+    upgrade_parser = subparsers.add_parser('upgrade-dep', help='Set a dependency to a version range in every project that declares it')
+    upgrade_parser.add_argument('dependency', help='Name of the NPM dependency to upgrade')
+    upgrade_parser.add_argument('version_range', help='Version range to write to package.json, e.g. ^5.2.0')
+    upgrade_parser.add_argument('--build', action='store_true', help='Also install and run the build as a check')
+    upgrade_parser.add_argument('--jobs', type=int, default=8, help='Number of projects to update at once (default: 8)')
+    upgrade_parser.add_argument('--registry', help='npm registry or mirror URL used to check the range')
+    unused_parser = subparsers.add_parser('unused-dep-check', help='Report unused dependencies with depcheck')
+    unused_parser.add_argument('--jobs', type=int, default=8, help='Number of projects to check at once (default: 8)')
+    find_parser = subparsers.add_parser('find-dep', help='List the projects that declare a dependency')
+    find_parser.add_argument('dependency', help='Name of the NPM dependency to look for')
+    find_parser.add_argument('--ref', help='Read package.json at this ref (e.g. origin/master) instead of the worktree')
+    subparsers.add_parser('store-gc', help='Delete package store entries that no lockfile references anymore')
+    outdated_parser = subparsers.add_parser('outdated', help='Report outdated dependencies across all projects')
+    outdated_parser.add_argument('--registry', help='npm registry or mirror URL (default: $npm_config_registry or registry.npmjs.org)')
+    outdated_parser.add_argument('--ttl', type=int, default=3600, help='Seconds to reuse cached registry metadata (default: 3600)')
+    args = parser.parse_args()
+    Process.configure(args.timeout)
+    store = PackageStore() if args.store or args.action == 'store-gc' else None
+
+    actions = {
+        'discard-non-package-changes': lambda: Dependency_MGMNT.discard_non_package_changes(args.directory),
+        'remove-dep': lambda: Dependency_MGMNT.remove_dep(args.directory, args.dependency, args.lockfile_only,
+                                                          args.build, args.jobs, store),
+        'upgrade-dep': lambda: Dependency_MGMNT.upgrade_dep(args.directory, args.dependency, args.version_range,
+                                                            args.build, args.jobs, args.registry, store),
+        'store-gc': lambda: store.gc([os.path.join(args.directory, d) for d in os.listdir(args.directory)]),
+        'unused-dep-check': lambda: Dependency_MGMNT.unused_dep_check(args.directory, args.jobs),
+        'find-dep': lambda: Dependency_MGMNT.find_dep(args.directory, args.dependency, args.ref),
+        'outdated': lambda: Dependency_MGMNT.outdated_report(args.directory, args.registry, args.ttl),
+    }
+
+    if args.profile:
+        with Profiler(args.profile):
+            actions[args.action]()
+    else:
+        actions[args.action]()
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import os
+import argparse
+import subprocess
 from pick import pick
-from utils import FileEditing, GitHubActions, Formatting
+from collections import Counter
+from utils import (FileEditing, GitHubActions, Formatting, Fleet, BranchPruning, RepoSync, Profiler, Pipeline, Stage,
+                   CodeSearch, StatusIndex, SSHMultiplexer, PRStatus, HttpCache, Process, Maintenance)
 
 class MainApp:
     def __init__(self):
@@ -10,6 +14,7 @@ class MainApp:
         os.system('clear')
         self.repo_path = None  # Folder containing all repositories
         self.utils = None  # Placeholder for your utility class
+        self.status_index = None  # Live repository status, when the watcher is running
 
     # Set defaults
     def set_repo_path(self):
@@ -25,6 +30,36 @@ class MainApp:
         if not os.path.isdir(self.repo_path):
             print(f"The path '{self.repo_path}' does not exist or is not a directory.")
             self.repo_path = None
+
+        # The status index belongs to the previous parent folder
+        self.stop_status_watcher()
+
+    def start_status_watcher(self):
+        """
+        Build the repository status index and keep it current with a background watcher.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        self.stop_status_watcher()
+        self.status_index = StatusIndex(self.repo_path)
+        if self.status_index.start():
+            print(f"Watching {self.status_index.summary()}")
+        else:
+            print(f"Indexed {self.status_index.summary()}")
+        input("\nPress Enter to go back to the menu...")
+
+    def stop_status_watcher(self):
+        """
+        Stop the background status watcher, if running.
+        """
+        if self.status_index:
+            self.status_index.stop()
+            self.status_index = None
     
     def get_user_pat(self):
         """
@@ -42,6 +77,28 @@ class MainApp:
 
 
     # Bulk Actions #
+    def for_each_repo(self, action):
+        """
+        Run 'action(repo_path)' in every directory of the parent folder, one at a time.
+        Repositories that time out are listed at the end; Ctrl-C stops the loop but keeps the summary.
+        """
+        timed_out = []
+        try:
+            # Loop through all directories in the parent folder
+            for root, dirs, files in os.walk(self.repo_path):
+                for dir_name in dirs:
+                    repo_path = os.path.join(root, dir_name)
+                    try:
+                        action(repo_path)
+                    except subprocess.TimeoutExpired as e:
+                        print(f"Timed out in {repo_path}: {e}")
+                        timed_out.append(repo_path)
+                break  # Prevent walking into subdirectories
+        except KeyboardInterrupt:
+            print("\nCancelled.")
+
+        Fleet.print_report({"timed_out": timed_out})
+
     def bulk_create_and_checkout_branches(self):
         """
         Bulk create and checkout branches in all repositories.
@@ -60,14 +117,13 @@ class MainApp:
             print("Branch name cannot be empty!")
         else:
             Formatting.print_separator()
-            # Loop through all directories in the parent folder
-            for root, dirs, files in os.walk(self.repo_path):
-                for dir_name in dirs:
-                    repo_path = os.path.join(root, dir_name)
-                    GitHubActions.create_and_switch_branch(repo_path, branch_name)
-                    GitHubActions.push_branch_set_upstream(repo_path)
-                    print("\n")
-                break  # Prevent walking into subdirectories
+
+            def create_and_push(repo_path):
+                GitHubActions.create_and_switch_branch(repo_path, branch_name)
+                GitHubActions.push_branch_set_upstream(repo_path)
+                print("\n")
+
+            self.for_each_repo(create_and_push)
         
         input("Press Enter to go back to the menu...")
 
@@ -88,12 +144,12 @@ class MainApp:
             print("Branch name cannot be empty!")
         else:
             Formatting.print_separator()
-            for root, dirs, files in os.walk(self.repo_path):
-                for dir_name in dirs:
-                    repo_path = os.path.join(root, dir_name)
-                    GitHubActions.delete_local_and_remote_branch(repo_path, branch_name)
-                    print("\n")
-                break  # Prevent walking into subdirectories
+
+            def delete_branch(repo_path):
+                GitHubActions.delete_local_and_remote_branch(repo_path, branch_name)
+                print("\n")
+
+            self.for_each_repo(delete_branch)
         
         input("Press Enter to go back to the menu...")
         
@@ -102,6 +158,242 @@ class MainApp:
         # self.utils.delete_branches(self.repo_path, branch_name)
         # print("Bulk delete branches functionality goes here.")
 
+    def bulk_remote_branches(self, delete=False):
+        """
+        Bulk create or delete several branches on the remote of every repository,
+        using a single push per repository and no local checkout.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        action = "delete" if delete else "create"
+        branch_input = input(f"Enter the branch name(s) to {action}, separated by commas: ").strip()
+        branch_names = [name.strip() for name in branch_input.split(",") if name.strip()]
+
+        if not branch_names:
+            print("Branch name cannot be empty!")
+            input("Press Enter to go back to the menu...")
+            return
+
+        if not delete:
+            source_ref = input("Enter the ref to create the branches from [HEAD]: ").strip() or "HEAD"
+
+        Formatting.print_separator()
+        if delete:
+            self.for_each_repo(lambda repo_path: GitHubActions.delete_remote_branches(repo_path, branch_names))
+        else:
+            self.for_each_repo(lambda repo_path: GitHubActions.create_remote_branches(repo_path, branch_names, source_ref))
+
+        input("\nPress Enter to go back to the menu...")
+
+    def bulk_prune_stale_branches(self):
+        """
+        Find remote branches matching a pattern across all repositories in parallel,
+        show a dry-run summary, then delete them with one push per repository.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        pattern = input("Enter the branch pattern to prune (glob, e.g. feature/*): ").strip()
+
+        if not pattern:
+            print("Pattern cannot be empty!")
+            input("Press Enter to go back to the menu...")
+            return
+
+        use_regex = input("Treat the pattern as a regular expression? (y/N): ").strip().lower() == "y"
+        merged_only = input("Only prune branches merged into the default branch? (y/N): ").strip().lower() == "y"
+        min_age_input = input("Only prune branches whose last commit is older than N days [0]: ").strip()
+        if min_age_input and not min_age_input.isdigit():
+            print("Number of days must be a whole number!")
+            input("Press Enter to go back to the menu...")
+            return
+        min_age_days = int(min_age_input) if min_age_input else 0
+
+        Formatting.print_separator()
+
+        repo_paths = Fleet.list_repos(self.repo_path)
+        print(f"Listing remote branches in {len(repo_paths)} repositories...")
+        report = {}
+        findings = Fleet.run_parallel(
+            repo_paths,
+            lambda repo_path: BranchPruning.find_stale_branches(repo_path, pattern, use_regex, merged_only, min_age_days),
+            report=report
+        )
+        Fleet.print_report(report)
+
+        # Dry-run summary
+        to_delete = {}
+        for repo_path in sorted(findings):
+            finding = findings[repo_path]
+            if not finding:
+                continue
+            if finding["unknown"]:
+                print(f"{repo_path}: {len(finding['unknown'])} branch(es) not checked, commits not fetched locally")
+            if finding["stale"]:
+                to_delete[repo_path] = [entry["branch"] for entry in finding["stale"]]
+                print(f"\n{repo_path}:")
+                for entry in finding["stale"]:
+                    age = f"{entry['age_days']:.0f}d" if entry["age_days"] is not None else "-"
+                    print(f"    {entry['branch']:<60} {age}")
+
+        total = sum(len(branches) for branches in to_delete.values())
+        print(f"\n{total} branch(es) in {len(to_delete)} repositories match.")
+
+        if total and input("Delete these branches? (y/N): ").strip().lower() == "y":
+            results = Fleet.run_parallel(
+                list(to_delete),
+                lambda repo_path: GitHubActions.delete_remote_branches(repo_path, to_delete[repo_path]),
+                report=report
+            )
+            failed = [repo_path for repo_path, ok in results.items() if not ok]
+            print(f"\nPruned branches in {len(results) - len(failed)} repositories, {len(failed)} failed.")
+            for repo_path in failed:
+                print(f"    {repo_path}")
+            Fleet.print_report(report)
+
+        input("\nPress Enter to go back to the menu...")
+
+    def bulk_sync_repos(self):
+        """
+        Clone missing repositories and fast-forward existing ones in parallel,
+        from a GitHub organization or a manifest file of clone URLs.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        source = input("Enter an organization name or the path to a manifest file: ").strip()
+
+        if not source:
+            print("Organization or manifest cannot be empty!")
+            input("Press Enter to go back to the menu...")
+            return
+
+        try:
+            if os.path.isfile(source):
+                repos = RepoSync.read_manifest(source)
+            else:
+                if not getattr(self, "github_token", None):
+                    print("GitHub Personal Access Token not set. Please set it first.")
+                    input("\nPress Enter to go back to the menu...")
+                    return
+                repos = RepoSync.list_org_repos(source, self.github_token)
+        except Exception as e:
+            print(f"Error listing repositories: {e}")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        reference_path = input("Enter the path to a shared reference repository (leave empty for none): ").strip()
+        if reference_path:
+            reference_path = os.path.abspath(reference_path)
+            if input("Update the reference repository first? (y/N): ").strip().lower() == "y":
+                RepoSync.update_reference_repo(reference_path, repos)
+
+        Formatting.print_separator()
+        print(f"Syncing {len(repos)} repositories into {self.repo_path}...")
+
+        report = {}
+        results = RepoSync.sync(self.repo_path, repos, reference_path or None, report=report)
+        counts = Counter(results.values())
+        print("\nSummary: " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+        Fleet.print_report(report)
+
+        input("\nPress Enter to go back to the menu...")
+
+    def bulk_search_code(self):
+        """
+        Search the tracked files of all repositories in parallel and group the matches by repository.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        query = input("Enter the text to search for: ").strip()
+
+        if not query:
+            print("Search text cannot be empty!")
+            input("Press Enter to go back to the menu...")
+            return
+
+        regex = input("Treat the search text as a regular expression? (y/N): ").strip().lower() == "y"
+        ignore_case = input("Ignore case? (y/N): ").strip().lower() == "y"
+
+        Formatting.print_separator()
+
+        report = {}
+        results = CodeSearch.search(self.repo_path, query, regex, ignore_case, report=report)
+        for repo_path, matches in results.items():
+            print(f"\n{repo_path} ({len(matches)} matches)")
+            for path, line_number, text in matches:
+                print(f"    {path}:{line_number}: {text.strip()}")
+
+        total = sum(len(matches) for matches in results.values())
+        print(f"\n{total} matches in {len(results)} repositories "
+              f"({CodeSearch.stats['hits']} cached, {CodeSearch.stats['misses']} searched).")
+        Fleet.print_report(report)
+
+        input("\nPress Enter to go back to the menu...")
+
+    def show_repo_status(self):
+        """
+        Print the branch, ahead/behind and dirty state of every repository from the status index.
+        """
+        os.system('clear')
+
+        if not self.status_index:
+            print("Status watcher not running. Start it from the defaults menu first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        print(f"{'Repository':<40} {'Branch':<30} {'Ahead':<6} {'Behind':<7} {'Dirty'}")
+        print(f"{'-'*40} {'-'*30} {'-'*6} {'-'*7} {'-'*5}")
+        for repo_path, status in sorted(self.status_index.snapshot().items()):
+            print(f"{os.path.basename(repo_path):<40} {status['branch'] or '-':<30} "
+                  f"{status['ahead']:<6} {status['behind']:<7} {'yes' if status['dirty'] else ''}")
+        print(f"\n{self.status_index.summary()}")
+
+        input("\nPress Enter to go back to the menu...")
+
+    def bulk_maintenance(self):
+        """
+        Repack and index every repository in parallel so later git commands run faster,
+        and show sizes and 'git status' timings before and after.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        while True:
+            workers = input("Enter the number of repositories to maintain at once (default 8): ").strip()
+            if not workers or (workers.isdigit() and int(workers) >= 1):
+                break
+            print("Number of repositories must be a whole number of at least 1!")
+
+        fsmonitor = input("Also enable the fsmonitor daemon (one background process per repository)? (y/N): ").strip().lower() == "y"
+
+        Maintenance.run(self.repo_path, int(workers) if workers else 8, fsmonitor)
+        Formatting.print_separator()
+
+        input("\nPress Enter to go back to the menu...")
+
     def bulk_copy_folder(self):
         """
         Bulk copy a folder into all repositories.
@@ -131,20 +423,20 @@ class MainApp:
         
         Formatting.print_separator()
 
-        # Loop through all directories in the parent folder
-        for root, dirs, files in os.walk(self.repo_path):
-            for dir_name in dirs:
-                repo_path = os.path.join(root, dir_name)
-                try:
-                    # Copy the folder to the repository
-                    FileEditing.copy_folder_to_repos(source_folder, repo_path)
-
-                    # Stage, commit, and push the changes
-                    GitHubActions.stage_commit_and_push(repo_path, commit_message)
-                except Exception as e:
-                    print(f"Skipping {repo_path} due to errors.")
-                    print(f"Error: {e}")
-            break# Prevent walking into subdirectories
+        def copy_and_push(repo_path):
+            try:
+                # Copy the folder to the repository
+                FileEditing.copy_folder_to_repos(source_folder, repo_path)
+
+                # Stage, commit, and push the changes
+                GitHubActions.stage_commit_and_push(repo_path, commit_message)
+            except subprocess.TimeoutExpired:
+                raise
+            except Exception as e:
+                print(f"Skipping {repo_path} due to errors.")
+                print(f"Error: {e}")
+
+        self.for_each_repo(copy_and_push)
 
         input("Press Enter to go back to the menu...")
 
@@ -168,17 +460,17 @@ class MainApp:
         
         Formatting.print_separator()
 
-        # Loop through all directories in the parent folder
-        for root, dirs, files in os.walk(self.repo_path):
-            for dir_name in dirs:
-                repo_path = os.path.join(root, dir_name)
-                try:
-                    # Stage, commit, and push the changes
-                    GitHubActions.stage_commit_and_push(repo_path, commit_message)
-                except Exception as e:
-                    print(f"Skipping {repo_path} due to errors.")
-                    print(f"Error: {e}")
-            break# Prevent walking into subdirectories
+        def commit_and_push(repo_path):
+            try:
+                # Stage, commit, and push the changes
+                GitHubActions.stage_commit_and_push(repo_path, commit_message)
+            except subprocess.TimeoutExpired:
+                raise
+            except Exception as e:
+                print(f"Skipping {repo_path} due to errors.")
+                print(f"Error: {e}")
+
+        self.for_each_repo(commit_and_push)
 
         input("Press Enter to go back to the menu...")
 
@@ -195,18 +487,18 @@ class MainApp:
         
         Formatting.print_separator()
 
-        # Loop through all directories in the parent folder
-        for root, dirs, files in os.walk(self.repo_path):
-            for dir_name in dirs:
-                repo_path = os.path.join(root, dir_name)
-                try:
-                    # Stage, commit, and push the changes
-                    GitHubActions.revert_package_lock_to_master(repo_path)
-                except Exception as e:
-                    print(f"Skipping {repo_path} due to errors.")
-                    print(f"Error: {e}")
-                Formatting.print_separator()
-            break# Prevent walking into subdirectories
+        def revert_pkglck(repo_path):
+            try:
+                # Stage, commit, and push the changes
+                GitHubActions.revert_package_lock_to_master(repo_path)
+            except subprocess.TimeoutExpired:
+                raise
+            except Exception as e:
+                print(f"Skipping {repo_path} due to errors.")
+                print(f"Error: {e}")
+            Formatting.print_separator()
+
+        self.for_each_repo(revert_pkglck)
 
         input("Press Enter to go back to the menu...")
 
@@ -239,27 +531,22 @@ class MainApp:
         # Print a separator
         Formatting.print_separator()
 
-        pr_links = []
+        # Stream repositories through push -> PR so pushing one repo overlaps with the API call for another
+        pipeline = Pipeline([
+            Stage("push", GitHubActions.push_branch, limit=8),
+            Stage("pr", lambda repo_path: GitHubActions.create_pull_request_enterprise(
+                repo_path, branch_name, pr_title, pr_description, self.github_token), limit=4),
+        ])
+        outcomes = pipeline.run(Fleet.list_repos(self.repo_path))
 
-        # Loop through all directories in the parent folder
-        for root, dirs, files in os.walk(self.repo_path):
-            for dir_name in dirs:
-                repo_path = os.path.join(root, dir_name)
-                try:
-                    # Push the branch
-                    GitHubActions.push_branch(repo_path)
-                    
-                    # Create the PR
-                    pr_link = GitHubActions.create_pull_request_enterprise(repo_path, branch_name, pr_title, pr_description, self.github_token)
-
-                    pr_links.append(f"{repo_path}: {pr_link}")
-
-                    print("\n")
-                except Exception as e:
-                    print(f"Skipping {self.repo_path} due to the following errors.")
-                    print(f"Error: {e}")
-                Formatting.print_separator()
-            break  # Prevent walking into subdirectories
+        pr_links = []
+        for repo_path in sorted(outcomes):
+            outcome = outcomes[repo_path]
+            if outcome["failed_stage"] and not (outcome["timed_out"] or outcome["cancelled"]):
+                print(f"Skipping {repo_path} due to the following errors.")
+                print(f"Error: {outcome['error']}")
+            elif outcome["results"].get("pr"):
+                pr_links.append(f"{repo_path}: {outcome['results']['pr']}")
 
         # Print all PR links at the end
         if pr_links:
@@ -267,8 +554,50 @@ class MainApp:
             for link in pr_links:
                 print(link)
 
+        Fleet.print_report({
+            "timed_out": [repo_path for repo_path, outcome in outcomes.items() if outcome["timed_out"]],
+            "cancelled": [repo_path for repo_path, outcome in outcomes.items() if outcome["cancelled"]],
+        })
+
         input("Press Enter to go back to the menu...")
 
+    def bulk_pr_status(self):
+        """
+        Show review, mergeability and CI state of the PRs for a head branch across all repositories.
+        """
+        os.system('clear')
+
+        if not self.repo_path:
+            print("Parent folder not set. Please set the parent folder first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        if not getattr(self, "github_token", None):
+            print("GitHub Personal Access Token not set. Please set it first.")
+            input("\nPress Enter to go back to the menu...")
+            return
+
+        branch_name = input("Enter the head branch of the Pull Requests: ").strip()
+
+        if not branch_name:
+            print("Branch name cannot be empty!")
+            input("Press Enter to go back to the menu...")
+            return
+
+        watch = input("Keep watching for changes? (y/N): ").strip().lower() == "y"
+
+        Formatting.print_separator()
+
+        try:
+            if watch:
+                PRStatus.watch(self.repo_path, branch_name, self.github_token)
+            else:
+                PRStatus.report(self.repo_path, branch_name, self.github_token)
+        except Exception as e:
+            print(f"Error fetching PR status: {e}")
+
+        input("\nPress Enter to go back to the menu...")
+
     ##########################
 
 
@@ -281,14 +610,25 @@ class MainApp:
             "commit and push",
             "create then checkout branches",
             "delete branches",
+            "create branches (remote only)",
+            "delete branches (remote only)",
+            "prune stale branches",
+            "sync repositories",
+            "search code",
+            "show repository status",
+            "maintain repositories",
             "copy folder into repositories",
             "create PRs",
+            "PR status",
             "back"
         ]
 
         while True:
             # Display the bulk actions menu
-            selected_option, _ = pick(options, title="Select a bulk action:", indicator="=>")
+            title = "Select a bulk action:"
+            if self.status_index:
+                title += f"\n[{self.status_index.summary()}]"
+            selected_option, _ = pick(options, title=title, indicator="=>")
             
             # Handle the selected option
             if selected_option == "commit and push":
@@ -297,10 +637,26 @@ class MainApp:
                 self.bulk_create_and_checkout_branches()
             elif selected_option == "delete branches":
                 self.bulk_delete_branches()
+            elif selected_option == "create branches (remote only)":
+                self.bulk_remote_branches()
+            elif selected_option == "delete branches (remote only)":
+                self.bulk_remote_branches(delete=True)
+            elif selected_option == "prune stale branches":
+                self.bulk_prune_stale_branches()
+            elif selected_option == "sync repositories":
+                self.bulk_sync_repos()
+            elif selected_option == "search code":
+                self.bulk_search_code()
+            elif selected_option == "show repository status":
+                self.show_repo_status()
+            elif selected_option == "maintain repositories":
+                self.bulk_maintenance()
             elif selected_option == "copy folder into repositories":
                 self.bulk_copy_folder()
             elif selected_option == "create PRs":
                 self.bulk_create_enterprise_prs()
+            elif selected_option == "PR status":
+                self.bulk_pr_status()
             elif selected_option == "back":
                 break
 
@@ -324,6 +680,7 @@ class MainApp:
             elif selected_option == "bulk actions":
                 self.show_bulk_actions_menu()
             if selected_option == "exit":
+                self.stop_status_watcher()
                 print("Exiting the application. Goodbye!")
                 break
 
@@ -335,6 +692,7 @@ class MainApp:
         options = [
             "set parent folder of repos",
             "set github personal access token",
+            "start repository status watcher",
             "back"
         ]
         
@@ -347,6 +705,8 @@ class MainApp:
                 self.set_repo_path()
             if selected_option == "set github personal access token":
                 self.get_user_pat()
+            if selected_option == "start repository status watcher":
+                self.start_status_watcher()
             elif selected_option == "back":
                 break
 
@@ -354,6 +714,35 @@ class MainApp:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Bulk Git and GitHub actions across a folder of repositories.')
+    parser.add_argument('--profile', metavar='OUTPUT', help='Sample the run and write collapsed stacks to OUTPUT')
+    parser.add_argument('--no-ssh-mux', action='store_true', help='Do not share one SSH connection across git commands')
+    parser.add_argument('--no-http-cache', action='store_true', help='Do not cache GitHub API responses on disk')
+    parser.add_argument('--timeout', action='append', metavar='STEP=SECONDS',
+                        help='Per-step timeout, e.g. git=120 or npm=900 (repeatable)')
+    parser.add_argument('--github-url', help='GitHub Enterprise base URL (default: $GITHUB_ENTERPRISE_URL or the company instance)')
+    args = parser.parse_args()
+    Process.configure(args.timeout)
+    if args.github_url:
+        GitHubActions.set_base_url(args.github_url)
+
+    # Answer repeated read-only GitHub API calls with conditional requests
+    if not args.no_http_cache:
+        HttpCache.enable()
+
+    # Share one SSH connection to the Enterprise host across every git push/fetch of the run
+    ssh_mux = SSHMultiplexer()
+    if not args.no_ssh_mux:
+        ssh_mux.start()
+
     # Initialize and run the application
     app = MainApp()
-    app.show_menu()
\ No newline at end of file
+    try:
+        if args.profile:
+            with Profiler(args.profile):
+                app.show_menu()
+        else:
+            app.show_menu()
+    finally:
+        ssh_mux.stop()
+        HttpCache.report()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import os
+import sys
+import argparse
+
+# Allow importing the shared utils package when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.maintenance import Maintenance
+from utils.profiling import Profiler
+from utils.process import Process
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description='Repack and index every Git repository in a directory, e.g. from a nightly cron job.')
+    parser.add_argument('--directory', required=True, help='Parent directory containing the repositories to maintain')
+    parser.add_argument('--jobs', type=positive_int, default=8, help='Number of repositories to maintain at once (default: 8)')
+    parser.add_argument('--timeout', action='append', metavar='STEP=SECONDS',
+                        help='Per-step timeout, e.g. git=1800 (repeatable)')
+    parser.add_argument('--fsmonitor', action='store_true',
+                        help="Also set core.fsmonitor; git then keeps a daemon running per repository")
+    parser.add_argument('--profile', metavar='OUTPUT', help='Sample the run and write collapsed stacks to OUTPUT')
+    args = parser.parse_args()
+    Process.configure(args.timeout)
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: Directory '{args.directory}' not found.")
+        print("\nOperation failed.")
+        sys.exit(1)
+
+    if args.profile:
+        with Profiler(args.profile):
+            Maintenance.run(args.directory, args.jobs, args.fsmonitor)
+    else:
+        Maintenance.run(args.directory, args.jobs, args.fsmonitor)
+    print("\nOperation completed.")
+
+if __name__ == "__main__":
+    main()
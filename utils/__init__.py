@@ -5,5 +5,21 @@ from .file_editing import FileEditing
 from .github_actions import GitHubActions
 from .formatting import Formatting
 from .dependency_mgmnt import Dependency_MGMNT
+from .fleet import Fleet
+from .branch_pruning import BranchPruning
+from .repo_sync import RepoSync
+from .profiling import Profiler
+from .pipeline import Pipeline, Stage
+from .git_cat_file import CatFileReader
+from .cache import Cache
+from .code_search import CodeSearch
+from .status_watcher import StatusIndex
+from .ssh_mux import SSHMultiplexer
+from .pr_status import PRStatus
+from .http_cache import HttpCache
+from .process import Process, Cancelled
+from .run_history import RunHistory
+from .package_store import PackageStore
+from .maintenance import Maintenance
 
-__all__ = ["FileEditing", "GitHubActions", "Formatting", "Dependency_MGMNT"]
+__all__ = ["FileEditing", "GitHubActions", "Formatting", "Dependency_MGMNT", "Fleet", "BranchPruning", "RepoSync", "Profiler", "Pipeline", "Stage", "CatFileReader", "Cache", "CodeSearch", "StatusIndex", "SSHMultiplexer", "PRStatus", "HttpCache", "Process", "Cancelled", "RunHistory", "PackageStore", "Maintenance"]
@@ -0,0 +1,84 @@
+import re
+import time
+import fnmatch
+from .github_actions import GitHubActions
+from .process import Process
+
+class BranchPruning:
+    @staticmethod
+    def _commit_times(repo_path, shas):
+        """
+        Return {sha: commit_timestamp} for the commits that exist in the local object database.
+        Commits that were never fetched are left out.
+        """
+        if not shas:
+            return {}
+
+        # Find out which commits are present locally without failing on missing ones
+        check = Process.run(["git", "cat-file", "--batch-check"], cwd=repo_path,
+                            input="\n".join(shas) + "\n", capture_output=True, text=True)
+        present = [parts[0] for parts in (line.split() for line in check.stdout.splitlines())
+                   if len(parts) == 3 and parts[1] == "commit"]
+        if not present:
+            return {}
+
+        result = Process.run(["git", "log", "--no-walk=unsorted", "--format=%H %ct"] + present,
+                             cwd=repo_path, capture_output=True, text=True, check=True)
+        times = {}
+        for line in result.stdout.splitlines():
+            sha, timestamp = line.split()
+            times[sha] = int(timestamp)
+        return times
+
+    @staticmethod
+    def _is_merged(repo_path, sha, default_sha):
+        """
+        Check whether the commit is reachable from the default branch.
+        """
+        if not default_sha:
+            return False
+
+        result = Process.run(["git", "merge-base", "--is-ancestor", sha, default_sha],
+                             cwd=repo_path, capture_output=True)
+        return result.returncode == 0
+
+    @staticmethod
+    def find_stale_branches(repo_path, pattern, use_regex=False, merged_only=False, min_age_days=0):
+        """
+        Find the remote branches matching a glob (or regex) that are old enough and,
+        optionally, merged into the default branch.
+        Returns a dict with the matching branches and the ones that could not be checked.
+        """
+        default_branch, branches = GitHubActions.list_remote_branches(repo_path)
+
+        if use_regex:
+            matcher = re.compile(pattern)
+            matches = {name: sha for name, sha in branches.items() if matcher.search(name)}
+        else:
+            matches = {name: sha for name, sha in branches.items() if fnmatch.fnmatchcase(name, pattern)}
+
+        # Never prune the default branch
+        matches.pop(default_branch, None)
+
+        stale = []
+        unknown = []
+        needs_commits = merged_only or min_age_days > 0
+        times = BranchPruning._commit_times(repo_path, list(set(matches.values()))) if needs_commits else {}
+        default_sha = branches.get(default_branch)
+        now = time.time()
+
+        for name, sha in sorted(matches.items()):
+            age_days = None
+            if needs_commits:
+                if sha not in times:
+                    unknown.append(name)
+                    continue
+                age_days = (now - times[sha]) / 86400
+                if age_days < min_age_days:
+                    continue
+                # A default branch that was never fetched counts as "not merged"
+                if merged_only and not BranchPruning._is_merged(repo_path, sha, default_sha):
+                    continue
+            stale.append({"branch": name, "sha": sha, "age_days": age_days})
+
+        return {"default_branch": default_branch, "stale": stale, "unknown": unknown}
@@ -0,0 +1,13 @@
+import os
+
+class Cache:
+    @staticmethod
+    def path(*parts):
+        """
+        Return a directory under the tool's cache folder ($XDG_CACHE_HOME/automation-scripts),
+        creating it if needed.
+        """
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        directory = os.path.join(base, "automation-scripts", *parts)
+        os.makedirs(directory, exist_ok=True)
+        return directory
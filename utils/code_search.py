@@ -0,0 +1,106 @@
+import os
+import json
+import hashlib
+import threading
+from .cache import Cache
+from .process import Process
+from .fleet import Fleet, DEFAULT_WORKERS
+
+class CodeSearch:
+    """
+    Searches tracked files across repositories with `git grep`.
+    Results are cached per query and repository HEAD, so repeating a search against
+    unchanged repositories does not run git at all.
+    """
+
+    # Oldest result files beyond this many are dropped after every search
+    max_entries = 2000
+    stats = {"hits": 0, "misses": 0}
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def _cache_file(repo_path, query, regex, ignore_case):
+        key = hashlib.sha256(json.dumps([os.path.abspath(repo_path), query, regex, ignore_case]).encode()).hexdigest()
+        return os.path.join(Cache.path("code_search"), f"{key}.json")
+
+    @staticmethod
+    def _count(result):
+        with CodeSearch._stats_lock:
+            CodeSearch.stats[result] += 1
+
+    @staticmethod
+    def search_repo(repo_path, query, regex=False, ignore_case=False):
+        """
+        Search the files tracked at HEAD for a fixed string (or extended regex).
+        Returns a list of (path, line_number, line) tuples.
+        """
+        head = Process.run(["git", "rev-parse", "HEAD"], cwd=repo_path,
+                           capture_output=True, text=True, check=True).stdout.strip()
+
+        cache_file = CodeSearch._cache_file(repo_path, query, regex, ignore_case)
+        try:
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached["head"] == head:
+                CodeSearch._count("hits")
+                return [tuple(match) for match in cached["matches"]]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        CodeSearch._count("misses")
+
+        # Search the HEAD tree rather than the worktree so results are fully determined by the cache key
+        command = ["git", "grep", "-n", "-I", "-z", "--no-color", "-E" if regex else "-F"]
+        if ignore_case:
+            command.append("-i")
+        command += ["-e", query, head, "--"]
+        result = Process.run(command, cwd=repo_path, capture_output=True)
+
+        # Exit code 1 means no matches
+        if result.returncode not in (0, 1):
+            raise RuntimeError(result.stderr.decode(errors="replace").strip())
+
+        # Decode bytes ourselves and split on "\n" only: text mode would turn "\r" into line breaks,
+        # and splitlines() also breaks on form feeds and other separators inside matched lines
+        matches = []
+        for line in result.stdout.decode(errors="replace").split("\n"):
+            if not line:
+                continue
+            path, line_number, text = line.split("\0", 2)
+            matches.append((path[len(head) + 1:], int(line_number), text))
+
+        with open(cache_file, 'w') as f:
+            json.dump({"head": head, "matches": matches}, f)
+
+        return matches
+
+    @staticmethod
+    def prune():
+        """
+        Drop the least recently written result files until at most max_entries remain.
+        """
+        directory = Cache.path("code_search")
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+        if len(paths) <= CodeSearch.max_entries:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - CodeSearch.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def search(parent_repo_path, query, regex=False, ignore_case=False, workers=DEFAULT_WORKERS, report=None):
+        """
+        Search every repository under the parent folder on a worker pool.
+        Returns a dict of repo_path -> matches for the repositories with at least one match.
+        """
+        CodeSearch.stats = {"hits": 0, "misses": 0}
+        results = Fleet.run_parallel(
+            Fleet.list_repos(parent_repo_path),
+            lambda repo_path: CodeSearch.search_repo(repo_path, query, regex, ignore_case),
+            workers=workers,
+            report=report
+        )
+        CodeSearch.prune()
+        return {repo_path: matches for repo_path, matches in sorted(results.items()) if matches}
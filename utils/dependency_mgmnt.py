@@ -7,8 +7,78 @@ import json
 import shutil
 import tempfile
 from collections import Counter
+from .git_cat_file import CatFileReader
+from .process import Process
+from .npm_registry import NpmRegistry
+from .semver import Semver
+from .fleet import Fleet, DEFAULT_WORKERS
+from .run_history import RunHistory
 
 class Dependency_MGMNT:
+    def read_package_json(repo_path, ref=None):
+        """
+        Read package.json from the worktree, or from 'ref' through the repository's
+        cat-file reader without touching the worktree. Returns None if it does not exist.
+        """
+        if ref:
+            return CatFileReader.for_repo(repo_path).read_json(ref, "package.json")
+
+        package_json_path = os.path.join(repo_path, 'package.json')
+        if not os.path.exists(package_json_path):
+            return None
+        with open(package_json_path, 'r') as f:
+            return json.load(f)
+
+    def find_dep(parent_repo_path, dependency, ref=None):
+        """
+        Lists the projects that declare a dependency, and the version range they use,
+        reading package.json at 'ref' (e.g. origin/master) when given.
+        """
+        try:
+            subdirs = sorted(d for d in os.listdir(parent_repo_path) if os.path.isdir(os.path.join(parent_repo_path, d)))
+        except FileNotFoundError:
+            print(f"Error: Directory '{parent_repo_path}' not found.")
+            print("\nOperation failed.")
+            sys.exit(1)
+
+        found = {}
+        for subdir in subdirs:
+            full_path = os.path.join(parent_repo_path, subdir)
+            if ref and not os.path.exists(os.path.join(full_path, '.git')):
+                continue
+
+            try:
+                package_data = Dependency_MGMNT.read_package_json(full_path, ref)
+            except json.JSONDecodeError:
+                print(f"Skipping {full_path} - Invalid package.json")
+                continue
+            if not package_data:
+                continue
+
+            for section in ("dependencies", "devDependencies"):
+                if dependency in package_data.get(section, {}):
+                    found[subdir] = (section, package_data[section][dependency])
+
+        CatFileReader.close_all()
+
+        where = f" at '{ref}'" if ref else ""
+        print(f"\n'{dependency}' is declared in {len(found)} projects{where}:")
+        print(f"{'Project':<40} {'Section':<16} {'Range'}")
+        print(f"{'-'*40} {'-'*16} {'-'*20}")
+        for subdir, (section, version_range) in found.items():
+            print(f"{subdir:<40} {section:<16} {version_range}")
+
+        return found
+
+    def print_timed_out(timed_out):
+        """
+        Lists the projects whose commands timed out, so they can be retried on their own.
+        """
+        if timed_out:
+            print(f"\nTimed out in {len(timed_out)} projects (retry these):")
+            for path in timed_out:
+                print(f"    {path}")
+
     def discard_non_package_changes(parent_repo_path):
         print(f"Starting to process repositories in '{parent_repo_path}'")
 
@@ -26,6 +96,8 @@ class Dependency_MGMNT:
 
         processed_count = 0
         skipped_count = 0
+        timed_out = []
+        cancelled = False
 
         for subdir in subdirs:
             full_path = os.path.join(parent_repo_path, subdir)
@@ -46,7 +118,7 @@ class Dependency_MGMNT:
 
             try:
                 # Find modified files
-                result = subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True)
+                result = Process.run(['git', 'status', '--porcelain'], capture_output=True, text=True)
                 lines = result.stdout.strip().split('\n')
 
                 for line in lines:
@@ -59,7 +131,7 @@ class Dependency_MGMNT:
                             modified_files.append(file_path)
 
                 # Discard all changes
-                subprocess.run(['git', 'reset', '--hard'], check=True)
+                Process.run(['git', 'reset', '--hard'], check=True)
                 print("All changes discarded.")
 
                 # Restore modified package files
@@ -69,6 +141,14 @@ class Dependency_MGMNT:
                         shutil.copy2(backup_path, file_name)
                         print(f"Restored changes to {file_name}")
 
+            except subprocess.TimeoutExpired as e:
+                print(f"Error: {e}")
+                timed_out.append(full_path)
+
+            except KeyboardInterrupt:
+                print("\nCancelled.")
+                cancelled = True
+
             except Exception as e:
                 print(f"Error processing repository: {e}")
                 skipped_count += 1
@@ -78,14 +158,200 @@ class Dependency_MGMNT:
                 os.chdir(original_dir)
                 processed_count += 1
 
+            if cancelled:
+                break
+
         print(f"\nSummary: Processed {processed_count} repositories, skipped {skipped_count} repositories")
-        print("\nOperation completed.")
+        Dependency_MGMNT.print_timed_out(timed_out)
+        print("\nOperation cancelled." if cancelled else "\nOperation completed.")
+
+    def detect_indent(text):
+        """
+        Return the indent used by a JSON document (a tab or a run of spaces), defaulting to two spaces.
+        """
+        for line in text.splitlines()[1:]:
+            stripped = line.lstrip(' \t')
+            if stripped and stripped != line:
+                return line[:len(line) - len(stripped)]
+        return "  "
+
+    def edit_package_json(repo_path, edit):
+        """
+        Apply 'edit' to the parsed package.json in place and write it back with the
+        original key order, indent and trailing newline. Returns True if it changed.
+        """
+        package_json_path = os.path.join(repo_path, 'package.json')
+        with open(package_json_path, 'r') as f:
+            text = f.read()
+
+        package_data = json.loads(text)
+        before = json.dumps(package_data)
+        edit(package_data)
+        if json.dumps(package_data) == before:
+            return False
+
+        new_text = json.dumps(package_data, indent=Dependency_MGMNT.detect_indent(text), ensure_ascii=False)
+        if text.endswith('\n'):
+            new_text += '\n'
+        with open(package_json_path, 'w') as f:
+            f.write(new_text)
+        return True
+
+    def update_project(full_path, edit, build=False, store=None):
+        """
+        Edits package.json in one project and regenerates only its lockfile. With 'build',
+        node_modules is brought up to date (from the PackageStore, if given) and the build is run as a check.
+        If the lockfile cannot be regenerated, package.json is put back.
+        Returns "unchanged", "updated", "build failed" or "failed". Output is printed as one block.
+        """
+        lines = [f"\n{'='*50}", f"Processing directory: {full_path}", f"{'='*50}"]
+        package_json_path = os.path.join(full_path, 'package.json')
+        with open(package_json_path, 'r') as f:
+            original = f.read()
+
+        try:
+            if not Dependency_MGMNT.edit_package_json(full_path, edit):
+                lines.append("package.json already up to date")
+                return "unchanged"
+            lines.append("Updated package.json")
+
+            install = ["npm", "install", "--no-audit", "--no-fund"]
+            commands = [["npm", "install", "--package-lock-only", "--ignore-scripts", "--no-audit", "--no-fund"]]
+            if build:
+                commands += [install, ["npm", "run", "build"]]
+
+            for i, cmd in enumerate(commands):
+                try:
+                    if store and cmd == install:
+                        lines.append("\nInstalling from the package store")
+                        returncode, output = store.install_project(full_path)
+                        lines.extend(output)
+                        errors = None
+                    else:
+                        lines.append(f"\nExecuting: {' '.join(cmd)}")
+                        process = Process.run(cmd, text=True, cwd=full_path,
+                                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                        returncode, errors = process.returncode, process.stderr
+                except BaseException:
+                    # Timed out, cancelled, interrupted or npm missing: package.json must not outlive a lockfile that wasn't regenerated
+                    if i == 0:
+                        with open(package_json_path, 'w') as f:
+                            f.write(original)
+                    raise
+                if returncode == 0:
+                    continue
+
+                if errors:
+                    lines.append("Errors:")
+                    lines.append(errors)
+                lines.append(f"Warning: Command exited with code {returncode}")
+                if i == 0:
+                    # Don't leave package.json out of step with the lockfile
+                    with open(package_json_path, 'w') as f:
+                        f.write(original)
+                    lines.append("Restored package.json")
+                    return "failed"
+                return "build failed"
+
+            lines.append("Lockfile regenerated, build passed" if build else "Lockfile regenerated")
+            return "updated"
+        finally:
+            print("\n".join(lines))
+
+    def update_projects(parent_repo_path, dependency, edit, build=False, workers=DEFAULT_WORKERS, action="update_dep", store=None):
+        """
+        Runs update_project in parallel in every project that declares 'dependency'
+        and prints a summary of the results.
+        """
+        try:
+            subdirs = sorted(d for d in os.listdir(parent_repo_path) if os.path.isdir(os.path.join(parent_repo_path, d)))
+        except FileNotFoundError:
+            print(f"Error: Directory '{parent_repo_path}' not found.")
+            print("\nOperation failed.")
+            sys.exit(1)
+
+        project_paths = []
+        skipped_count = 0
+        for subdir in subdirs:
+            full_path = os.path.join(parent_repo_path, subdir)
+            try:
+                package_data = Dependency_MGMNT.read_package_json(full_path)
+            except json.JSONDecodeError:
+                print(f"Skipping {full_path} - Invalid package.json")
+                skipped_count += 1
+                continue
+            if not package_data or not any(dependency in package_data.get(section, {})
+                                           for section in ("dependencies", "devDependencies")):
+                skipped_count += 1
+                continue
+            project_paths.append(full_path)
 
-    def remove_dep(parent_repo_path, dependency):
+        print(f"'{dependency}' is declared in {len(project_paths)} projects")
+        report = {}
+        history = RunHistory(action)
+        results = Fleet.run_parallel(project_paths, lambda path: Dependency_MGMNT.update_project(path, edit, build, store),
+                                     workers=workers, report=report, history=history)
+
+        counts = Counter(results.values())
+        failed = sorted([path for path, result in results.items() if result in ("failed", "build failed")]
+                        + report["failed"])
+        history.print_summary()
+        if store and build:
+            store.print_summary()
+        print(f"\nSummary: Updated {counts['updated'] + counts['build failed']} projects, "
+              f"{counts['unchanged']} already up to date, {len(failed)} failed, skipped {skipped_count} directories")
+        for path in failed:
+            print(f"    {results[path] or 'error'}: {path}")
+        Dependency_MGMNT.print_timed_out(sorted(report["timed_out"]))
+        print("\nOperation cancelled." if report["cancelled"] else "\nOperation completed.")
+        return results
+
+    def upgrade_dep(parent_repo_path, dependency, version_range, build=False, workers=DEFAULT_WORKERS, registry=None, store=None):
+        """
+        Sets 'dependency' to 'version_range' in every project that declares it,
+        regenerating only the lockfiles.
+        """
+        # Catch typos before touching every project
+        try:
+            Semver.parse_range(version_range)
+        except ValueError:
+            pass
+        else:
+            try:
+                metadata = NpmRegistry(registry).metadata(dependency)
+            except Exception as e:
+                print(f"Warning: Could not check '{version_range}' against the registry: {e}")
+                metadata = None
+            if metadata and not Semver.max_satisfying(metadata["versions"], version_range):
+                print(f"Error: No published version of '{dependency}' satisfies '{version_range}'.")
+                print("\nOperation failed.")
+                return None
+
+        print(f"Will set '{dependency}' to '{version_range}' in all projects")
+
+        def set_range(package_data):
+            for section in ("dependencies", "devDependencies"):
+                if dependency in package_data.get(section, {}):
+                    package_data[section][dependency] = version_range
+
+        return Dependency_MGMNT.update_projects(parent_repo_path, dependency, set_range, build, workers, "upgrade_dep", store)
+
+    def remove_dep(parent_repo_path, dependency, lockfile_only=False, build=False, workers=DEFAULT_WORKERS, store=None):
         """
         Runs commands to remove a specified NPM dependency in each subdirectory,
         but only if the dependency exists in that project.
+        With 'lockfile_only', package.json is edited directly and only the lockfile is regenerated;
+        the build is then only run when 'build' is set.
+        With a PackageStore, node_modules is linked from the store instead of running npm install.
         """
+        if lockfile_only:
+            print(f"Will remove dependency '{dependency}' from all projects (lockfile only)")
+
+            def remove(package_data):
+                for section in ("dependencies", "devDependencies"):
+                    package_data.get(section, {}).pop(dependency, None)
+
+            return Dependency_MGMNT.update_projects(parent_repo_path, dependency, remove, build, workers, "remove_dep", store)
 
         print(f"Starting to process projects in '{parent_repo_path}'")
         print(f"Will remove dependency '{dependency}' from all projects")
@@ -105,6 +371,8 @@ class Dependency_MGMNT:
         
         processed_count = 0
         skipped_count = 0
+        timed_out = []
+        cancelled = False
         
         # Process each subdirectory
         for subdir in subdirs:
@@ -119,8 +387,7 @@ class Dependency_MGMNT:
             
             # Check if dependency exists in the project
             try:
-                with open(package_json_path, 'r') as f:
-                    package_data = json.load(f)
+                package_data = Dependency_MGMNT.read_package_json(full_path)
                     
                 dependency_exists = False
                 
@@ -152,7 +419,7 @@ class Dependency_MGMNT:
             
             # Commands to run in the subdirectory
             commands = [
-                f"npm uninstall {dependency}",
+                f"npm uninstall --package-lock-only {dependency}" if store else f"npm uninstall {dependency}",
                 "rm -rf node_modules package-lock.json",
                 "npm run build",
                 "npm install"
@@ -164,10 +431,18 @@ class Dependency_MGMNT:
             
             # Run each command
             for cmd in commands:
-                print(f"\nExecuting: {cmd}")
                 try:
-                    process = subprocess.run(cmd, shell=True, check=False, text=True, 
-                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                    if store and cmd == "npm install":
+                        print("\nInstalling from the package store")
+                        returncode, output = store.install_project(full_path)
+                        print("\n".join(output))
+                        if returncode != 0:
+                            print(f"Warning: Install exited with code {returncode}")
+                        continue
+
+                    print(f"\nExecuting: {cmd}")
+                    process = Process.run(cmd, shell=True, check=False, text=True, 
+                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE)
                     
                     # Print command output
                     if process.stdout:
@@ -181,19 +456,91 @@ class Dependency_MGMNT:
                     
                     if process.returncode != 0:
                         print(f"Warning: Command exited with code {process.returncode}")
+                except subprocess.TimeoutExpired as e:
+                    # Later commands depend on this one, so stop here and move on to the next project
+                    print(f"Error: {e}")
+                    timed_out.append(full_path)
+                    break
+                except KeyboardInterrupt:
+                    print("\nCancelled.")
+                    cancelled = True
+                    break
                 except Exception as e:
                     print(f"Error executing command: {e}")
             
             # Return to original directory
             os.chdir(original_dir)
             processed_count += 1
+
+            if cancelled:
+                break
         
+        if store:
+            store.print_summary()
         print(f"\nSummary: Processed {processed_count} directories, skipped {skipped_count} directories")
-        print("\nOperation completed.")
+        Dependency_MGMNT.print_timed_out(timed_out)
+        print("\nOperation cancelled." if cancelled else "\nOperation completed.")
+
+    def depcheck_project(full_path):
+        """
+        Runs depcheck in one project and returns its unused dependencies,
+        or None if depcheck produced no usable output. Output is printed as one block.
+        """
+        lines = [f"\n{'='*50}", f"Running depcheck in: {full_path}", f"{'='*50}"]
+        subdir = os.path.basename(full_path)
+
+        try:
+            # First check if depcheck is installed
+            check_depcheck = Process.run("which depcheck || npm list -g depcheck", shell=True, text=True, cwd=full_path,
+                                         stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            
+            # Install depcheck locally if not found globally
+            if "depcheck" not in check_depcheck.stdout:
+                lines.append("Depcheck not found globally, installing it locally...")
+                install_depcheck = Process.run("npm install depcheck --no-save", shell=True, text=True, cwd=full_path,
+                                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                depcheck_cmd = "NODE_OPTIONS=--no-deprecation npx depcheck --json"
+            else:
+                depcheck_cmd = "NODE_OPTIONS=--no-deprecation depcheck --json"
+            
+            lines.append(f"\nExecuting: {depcheck_cmd}")
+            process = Process.run(depcheck_cmd, shell=True, check=False, text=True, cwd=full_path,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            
+            # Display warnings but don't treat them as failures
+            if process.stderr:
+                lines.append("Warnings (not affecting analysis):")
+                lines.append(process.stderr)
+            
+            # Check if we got any JSON output
+            if not process.stdout or not process.stdout.strip():
+                lines.append(f"No output received from depcheck. Skipping {subdir}.")
+                return None
+            
+            # Parse the JSON output
+            try:
+                depcheck_result = json.loads(process.stdout)
+            except json.JSONDecodeError:
+                lines.append(f"Failed to parse depcheck output. It may not be valid JSON.")
+                lines.append(f"Output was: {process.stdout}")
+                return None
+
+            # Get unused dependencies
+            unused_deps = []
+            if 'dependencies' in depcheck_result:
+                unused_deps.extend(depcheck_result['dependencies'])
+            if 'devDependencies' in depcheck_result:
+                unused_deps.extend(depcheck_result['devDependencies'])
+            
+            lines.append(f"Found {len(unused_deps)} unused dependencies in {subdir}")
+            return unused_deps
+        finally:
+            print("\n".join(lines))
 
-    def unused_dep_check(parent_repo_path):
+    def unused_dep_check(parent_repo_path, workers=DEFAULT_WORKERS):
         """
-        Runs depcheck in each subdirectory and collects the results.
+        Runs depcheck in each subdirectory in parallel and collects the results.
+        Projects that took longest on previous runs are started first.
         """
         # Get all immediate subdirectories
         try:
@@ -208,96 +555,48 @@ class Dependency_MGMNT:
             print("\nAnalysis failed.")
             sys.exit(1)
         
-        processed_count = 0
         skipped_count = 0
         all_unused_deps = {}
         projects_with_dep = {}
         
-        # Process each subdirectory
+        # Check which subdirectories are NPM projects
+        project_paths = []
         for subdir in subdirs:
             full_path = os.path.join(parent_repo_path, subdir)
-            package_json_path = os.path.join(full_path, 'package.json')
-            
-            # Check if it's an NPM project
-            if not os.path.exists(package_json_path):
+            if not os.path.exists(os.path.join(full_path, 'package.json')):
                 print(f"\nSkipping {full_path} - Not an NPM project (no package.json)")
                 skipped_count += 1
                 continue
-            
-            print(f"\n{'='*50}")
-            print(f"Running depcheck in: {full_path}")
-            print(f"{'='*50}")
-            
-            # Change to the subdirectory
-            original_dir = os.getcwd()
-            os.chdir(full_path)
-            
-            # Run depcheck
-            try:
-                # First check if depcheck is installed
-                check_depcheck = subprocess.run("which depcheck || npm list -g depcheck", shell=True, text=True, 
-                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                
-                # Install depcheck locally if not found globally
-                if "depcheck" not in check_depcheck.stdout:
-                    print("Depcheck not found globally, installing it locally...")
-                    install_depcheck = subprocess.run("npm install depcheck --no-save", shell=True, text=True,
-                                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    depcheck_cmd = "NODE_OPTIONS=--no-deprecation npx depcheck --json"
-                else:
-                    depcheck_cmd = "NODE_OPTIONS=--no-deprecation depcheck --json"
-                
-                print(f"\nExecuting: {depcheck_cmd}")
-                process = subprocess.run(depcheck_cmd, shell=True, check=False, text=True, 
-                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                
-                # Display warnings but don't treat them as failures
-                if process.stderr:
-                    print("Warnings (not affecting analysis):")
-                    print(process.stderr)
-                
-                # Check if we got any JSON output
-                if not process.stdout or not process.stdout.strip():
-                    print(f"No output received from depcheck. Skipping {subdir}.")
-                    os.chdir(original_dir)
-                    skipped_count += 1
-                    continue
-                
-                # Parse the JSON output
-                try:
-                    depcheck_result = json.loads(process.stdout)
-                    
-                    # Get unused dependencies
-                    unused_deps = []
-                    if 'dependencies' in depcheck_result:
-                        unused_deps.extend(depcheck_result['dependencies'])
-                    if 'devDependencies' in depcheck_result:
-                        unused_deps.extend(depcheck_result['devDependencies'])
-                    
-                    print(f"Found {len(unused_deps)} unused dependencies in {subdir}")
-                    
-                    # Add to the overall collection
-                    all_unused_deps[subdir] = unused_deps
-                    
-                    # Track which projects have which dependency
-                    for dep in unused_deps:
-                        if dep not in projects_with_dep:
-                            projects_with_dep[dep] = []
-                        projects_with_dep[dep].append(subdir)
-                    
-                except json.JSONDecodeError:
-                    print(f"Failed to parse depcheck output. It may not be valid JSON.")
-                    print(f"Output was: {process.stdout}")
-                    skipped_count += 1
-                    
-            except Exception as e:
-                print(f"Error running depcheck: {e}")
+            project_paths.append(full_path)
+
+        # Run depcheck in every project
+        report = {}
+        history = RunHistory("unused_dep_check")
+        results = Fleet.run_parallel(project_paths, Dependency_MGMNT.depcheck_project,
+                                     workers=workers, report=report, history=history)
+        timed_out = sorted(report["timed_out"])
+        cancelled = bool(report["cancelled"])
+        processed_count = len(results) - len(report["cancelled"])
+
+        for full_path in sorted(results):
+            unused_deps = results[full_path]
+            if unused_deps is None:
                 skipped_count += 1
+                continue
+
+            # Add to the overall collection
+            subdir = os.path.basename(full_path)
+            all_unused_deps[subdir] = unused_deps
             
-            # Return to original directory
-            os.chdir(original_dir)
-            processed_count += 1
-        
+            # Track which projects have which dependency
+            for dep in unused_deps:
+                if dep not in projects_with_dep:
+                    projects_with_dep[dep] = []
+                projects_with_dep[dep].append(subdir)
+
+        history.print_summary()
+        Dependency_MGMNT.print_timed_out(timed_out)
+
         # Skip summary if no data collected
         if not all_unused_deps:
             print("\nNo usable data collected from any projects.")
@@ -337,7 +636,9 @@ class Dependency_MGMNT:
                 json.dump({
                     "summary": {
                         "processed": processed_count,
-                        "skipped": skipped_count
+                        "skipped": skipped_count,
+                        "timed_out": timed_out,
+                        "cancelled": cancelled
                     },
                     "unused_by_project": all_unused_deps,
                     "projects_by_dependency": {dep: projs for dep, projs in projects_with_dep.items()}
@@ -346,4 +647,131 @@ class Dependency_MGMNT:
         except Exception as e:
             print(f"Error saving report file: {e}")
         
-        print("\nAnalysis completed.")
\ No newline at end of file
+        print("\nAnalysis completed.")
+
+    def installed_version(repo_path, dependency, lock_data=None):
+        """
+        Return the installed version of a dependency from package-lock.json,
+        falling back to node_modules, or None if it is not installed.
+        """
+        if lock_data:
+            # lockfileVersion 2 and 3
+            entry = lock_data.get("packages", {}).get(f"node_modules/{dependency}")
+            if entry and "version" in entry:
+                return entry["version"]
+            # lockfileVersion 1
+            entry = lock_data.get("dependencies", {}).get(dependency)
+            if entry and "version" in entry:
+                return entry["version"]
+
+        installed_path = os.path.join(repo_path, 'node_modules', dependency, 'package.json')
+        try:
+            with open(installed_path, 'r') as f:
+                return json.load(f).get("version")
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def outdated_report(parent_repo_path, registry=None, ttl=3600):
+        """
+        Reports outdated dependencies across every project, fetching each package's
+        registry metadata once and resolving current, wanted and latest versions in memory.
+        """
+        try:
+            subdirs = sorted(d for d in os.listdir(parent_repo_path) if os.path.isdir(os.path.join(parent_repo_path, d)))
+        except FileNotFoundError:
+            print(f"Error: Directory '{parent_repo_path}' not found.")
+            print("\nAnalysis failed.")
+            sys.exit(1)
+
+        # Collect declared dependencies and installed versions from every project
+        declared = {}
+        skipped_count = 0
+        for subdir in subdirs:
+            full_path = os.path.join(parent_repo_path, subdir)
+            try:
+                package_data = Dependency_MGMNT.read_package_json(full_path)
+            except json.JSONDecodeError:
+                print(f"Skipping {full_path} - Invalid package.json")
+                skipped_count += 1
+                continue
+            if not package_data:
+                skipped_count += 1
+                continue
+
+            lock_data = None
+            lock_path = os.path.join(full_path, 'package-lock.json')
+            if os.path.exists(lock_path):
+                try:
+                    with open(lock_path, 'r') as f:
+                        lock_data = json.load(f)
+                except json.JSONDecodeError:
+                    print(f"Ignoring invalid package-lock.json in {full_path}")
+
+            declared[subdir] = {}
+            for section in ("dependencies", "devDependencies"):
+                for dependency, version_range in package_data.get(section, {}).items():
+                    declared[subdir][dependency] = {
+                        "range": version_range,
+                        "current": Dependency_MGMNT.installed_version(full_path, dependency, lock_data),
+                    }
+
+        # Fetch each unique package once
+        names = {dependency for deps in declared.values() for dependency in deps}
+        npm_registry = NpmRegistry(registry, ttl)
+        print(f"Resolving {len(names)} unique packages across {len(declared)} projects from {npm_registry.registry}")
+        metadata = npm_registry.metadata_for(names)
+        print(f"Registry metadata: {npm_registry.stats['cached']} cached, {npm_registry.stats['fetched']} fetched")
+
+        outdated_by_project = {}
+        outdated_by_dependency = {}
+        for subdir, deps in declared.items():
+            for dependency, info in deps.items():
+                package_metadata = metadata.get(dependency)
+                if not package_metadata:
+                    continue
+                latest = package_metadata["dist-tags"].get("latest")
+                try:
+                    wanted = Semver.max_satisfying(package_metadata["versions"], info["range"])
+                except ValueError:
+                    # Tags, git URLs and file: paths are not semver ranges
+                    wanted = package_metadata["dist-tags"].get(info["range"])
+                if info["current"] == latest:
+                    continue
+
+                row = {"range": info["range"], "current": info["current"], "wanted": wanted, "latest": latest}
+                outdated_by_project.setdefault(subdir, {})[dependency] = row
+                outdated_by_dependency.setdefault(dependency, {})[subdir] = row
+
+        # Generate the summary report
+        print(f"\n{'='*50}")
+        print(f"OUTDATED DEPENDENCIES")
+        print(f"{'='*50}")
+        print(f"Checked {len(declared)} projects, skipped {skipped_count} directories")
+        print(f"\n{'Dependency':<40} {'Latest':<14} {'Count':<6} {'Current versions'}")
+        print(f"{'-'*40} {'-'*14} {'-'*6} {'-'*30}")
+
+        for dependency in sorted(outdated_by_dependency, key=lambda dep: -len(outdated_by_dependency[dep])):
+            rows = outdated_by_dependency[dependency]
+            latest = next(iter(rows.values()))["latest"] or "-"
+            current_versions = ', '.join(sorted({row["current"] or "missing" for row in rows.values()}))
+            if len(current_versions) > 30:
+                current_versions = current_versions[:27] + "..."
+            print(f"{dependency:<40} {latest:<14} {len(rows):<6} {current_versions}")
+
+        result_file = os.path.join(parent_repo_path, "outdated_dependencies_report.json")
+        try:
+            with open(result_file, 'w') as f:
+                json.dump({
+                    "summary": {
+                        "projects": len(declared),
+                        "skipped": skipped_count,
+                        "registry": npm_registry.registry
+                    },
+                    "outdated_by_project": outdated_by_project,
+                    "outdated_by_dependency": outdated_by_dependency
+                }, f, indent=2)
+            print(f"\nDetailed report saved to: {result_file}")
+        except Exception as e:
+            print(f"Error saving report file: {e}")
+
+        print("\nAnalysis completed.")
@@ -0,0 +1,84 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .process import Process, Cancelled
+
+DEFAULT_WORKERS = 8
+
+class Fleet:
+    @staticmethod
+    def list_repos(parent_repo_path):
+        """
+        Return the paths of the Git repositories directly under the parent folder.
+        """
+        repo_paths = []
+        for dir_name in sorted(os.listdir(parent_repo_path)):
+            repo_path = os.path.join(parent_repo_path, dir_name)
+            if os.path.isdir(os.path.join(repo_path, ".git")):
+                repo_paths.append(repo_path)
+        return repo_paths
+
+    @staticmethod
+    def run_parallel(repo_paths, action, workers=DEFAULT_WORKERS, report=None, history=None):
+        """
+        Run 'action(repo_path)' for every repository on a thread pool.
+        Returns a dict of repo_path -> result; repositories that raised map to None.
+        If 'report' is a dict it is filled with the repositories that 'timed_out', 'failed'
+        or were 'cancelled'. Ctrl-C kills the commands in flight and returns the partial results.
+        With a RunHistory, repositories start longest-expected-first and their durations are recorded.
+        """
+        if report is None:
+            report = {}
+        report.update(timed_out=[], failed=[], cancelled=[])
+
+        if history is not None:
+            repo_paths = history.order(repo_paths)
+            action = history.timed(action)
+
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(action, repo_path): repo_path for repo_path in repo_paths}
+        try:
+            for future in as_completed(futures):
+                repo_path = futures[future]
+                try:
+                    results[repo_path] = future.result()
+                except subprocess.TimeoutExpired as e:
+                    print(f"Timed out in {repo_path} after {e.timeout:.0f}s: {e.cmd}")
+                    results[repo_path] = None
+                    report["timed_out"].append(repo_path)
+                except Cancelled:
+                    results[repo_path] = None
+                    report["cancelled"].append(repo_path)
+                except Exception as e:
+                    print(f"Error in {repo_path}: {e}")
+                    results[repo_path] = None
+                    report["failed"].append(repo_path)
+        except KeyboardInterrupt:
+            print("\nCancelling, waiting for running commands to stop...")
+            Process.cancel_all()
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future, repo_path in futures.items():
+                if repo_path not in results:
+                    report["cancelled"].append(repo_path)
+            Process.reset()
+        finally:
+            executor.shutdown(wait=True)
+            if history is not None:
+                history.save()
+
+        return results
+
+    @staticmethod
+    def print_report(report):
+        """
+        Print the repositories that timed out or were cancelled, so they can be retried.
+        """
+        if report.get("timed_out"):
+            print(f"\nTimed out in {len(report['timed_out'])} repositories (retry these):")
+            for repo_path in sorted(report["timed_out"]):
+                print(f"    {repo_path}")
+        if report.get("cancelled"):
+            print(f"\nCancelled before finishing in {len(report['cancelled'])} repositories:")
+            for repo_path in sorted(report["cancelled"]):
+                print(f"    {repo_path}")
@@ -0,0 +1,115 @@
+import json
+import threading
+import subprocess
+from collections import OrderedDict
+
+class CatFileReader:
+    """
+    Reads file contents at any ref through long-lived `git cat-file` processes,
+    without checking anything out. Recently read blobs are kept in an LRU cache keyed by blob id,
+    so a ref that moves (after a pull or checkout) is never answered from a stale entry.
+    """
+
+    _readers = {}
+    _readers_lock = threading.Lock()
+
+    def __init__(self, repo_path, cache_size=256):
+        self.repo_path = repo_path
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # --batch-check resolves "<ref>:<path>" to a blob id; --batch reads blobs not in the cache
+        self._check = subprocess.Popen(["git", "cat-file", "--batch-check"], cwd=repo_path,
+                                       stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=repo_path,
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    @staticmethod
+    def for_repo(repo_path):
+        """
+        Return the shared reader for a repository, starting its process on first use.
+        """
+        with CatFileReader._readers_lock:
+            reader = CatFileReader._readers.get(repo_path)
+            if reader is None:
+                reader = CatFileReader(repo_path)
+                CatFileReader._readers[repo_path] = reader
+            return reader
+
+    @staticmethod
+    def close_all():
+        """
+        Stop every shared reader process.
+        """
+        with CatFileReader._readers_lock:
+            for reader in CatFileReader._readers.values():
+                reader.close()
+            CatFileReader._readers.clear()
+
+    def read(self, ref, path):
+        """
+        Return the bytes of 'path' at 'ref', or None if it does not exist there.
+        """
+        with self._lock:
+            header = self._request(self._check, f"{ref}:{path}")
+            if header is None:
+                return None
+            sha, object_type, _ = header
+            if object_type != "blob":
+                return None
+            if sha in self._cache:
+                self._cache.move_to_end(sha)
+                return self._cache[sha]
+
+            header = self._request(self._process, sha)
+            if header is None:
+                return None
+            content = self._process.stdout.read(int(header[2]))
+            self._process.stdout.read(1)  # Trailing newline after the object
+
+            self._cache[sha] = content
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return content
+
+    @staticmethod
+    def _request(process, name):
+        """
+        Send one object name and return its (sha, type, size) header, or None if it does not resolve.
+        """
+        process.stdin.write(f"{name}\n".encode())
+        process.stdin.flush()
+
+        # Header is "<sha> <type> <size>" or "<name> missing" / "<name> ambiguous"
+        header = process.stdout.readline().decode().rstrip("\n")
+        parts = header.split(" ")
+        if header.endswith(" missing") or header.endswith(" ambiguous") or len(parts) != 3 or not parts[2].isdigit():
+            return None
+        return tuple(parts)
+
+    def read_text(self, ref, path, encoding="utf-8"):
+        """
+        Return the text of 'path' at 'ref', or None if it does not exist there.
+        """
+        content = self.read(ref, path)
+        return content.decode(encoding) if content is not None else None
+
+    def read_json(self, ref, path):
+        """
+        Return the parsed JSON of 'path' at 'ref', or None if it does not exist there.
+        """
+        content = self.read(ref, path)
+        return json.loads(content) if content is not None else None
+
+    def close(self):
+        for process in (self._check, self._process):
+            if process.poll() is None:
+                process.stdin.close()
+                process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
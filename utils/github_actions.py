@@ -3,18 +3,27 @@ import json
 import subprocess
 import requests
 from github import Github, Auth
+from .process import Process, Cancelled
 
-GITHUB_API_URL = "https://github.info53.com"
+# Override with GITHUB_ENTERPRISE_URL (or GitHubActions.set_base_url) to point at another instance or a mock server
+GITHUB_API_URL = os.environ.get("GITHUB_ENTERPRISE_URL", "https://github.info53.com").rstrip("/")
 
 class GitHubActions:
+    @staticmethod
+    def set_base_url(url):
+        """
+        Point API calls and remote URL matching at another GitHub Enterprise host, e.g. a local mock server.
+        """
+        global GITHUB_API_URL
+        GITHUB_API_URL = url.rstrip("/")
+
     @staticmethod
     def push_branch(repo_path):
         """
         Push the current branch to the remote repository.
         """
         try:
-            os.chdir(repo_path)
-            subprocess.run(["git", "push", "origin", "HEAD"], check=True)
+            Process.run(["git", "push", "origin", "HEAD"], cwd=repo_path, check=True)
             print(f"Pushed branch in {repo_path}")
         except subprocess.CalledProcessError as e:
             print(f"Error pushing branch in {repo_path}: {e}")
@@ -29,12 +38,12 @@ class GitHubActions:
             os.chdir(repo_path)
 
             # Get the current branch name
-            result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], 
-                                    capture_output=True, text=True, check=True)
+            result = Process.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], 
+                                 capture_output=True, text=True, check=True)
             current_branch = result.stdout.strip()
 
             # Push branch to remote
-            subprocess.run(["git", "push", "--set-upstream", "origin", current_branch], check=True)
+            Process.run(["git", "push", "--set-upstream", "origin", current_branch], check=True)
 
             print(f"Pushed and set upstream for branch '{current_branch}' in {repo_path}")
 
@@ -58,8 +67,10 @@ class GitHubActions:
 
             # Create and switch to the new branch
             print(f"Creating new branch, '{branch_name}', in {repo_path}")
-            subprocess.run(["git", "checkout", "-b", branch_name], check=True)
+            Process.run(["git", "checkout", "-b", branch_name], check=True)
 
+        except (subprocess.TimeoutExpired, Cancelled):
+            raise
         except subprocess.CalledProcessError as e:
             print(f"Error in {repo_path}: {e}")
         except Exception as e:
@@ -83,30 +94,115 @@ class GitHubActions:
                 return
 
             # Get the current branch name
-            result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], 
-                                    capture_output=True, text=True, check=True)
+            result = Process.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], 
+                                 capture_output=True, text=True, check=True)
             current_branch = result.stdout.strip()
 
             # If the current branch is the one to be deleted, switch to 'master' or 'main'
             if current_branch == branch_name:
                 print(f"Currently on branch '{branch_name}', switching to 'master' or 'main' before deletion.")
-                switch_branch = "master" if subprocess.run(["git", "show-ref", "--verify", "--quiet", "refs/heads/master"]).returncode == 0 else "main"
-                subprocess.run(["git", "checkout", switch_branch], check=True)
+                switch_branch = "master" if Process.run(["git", "show-ref", "--verify", "--quiet", "refs/heads/master"]).returncode == 0 else "main"
+                Process.run(["git", "checkout", switch_branch], check=True)
                 print(f"Switched to '{switch_branch}'.")
 
             # Delete the local branch
-            subprocess.run(["git", "branch", "-D", branch_name], check=True)
+            Process.run(["git", "branch", "-D", branch_name], check=True)
             print(f"Deleted local branch '{branch_name}' in {repo_path}")
 
             # Delete the remote branch
-            subprocess.run(["git", "push", "origin", "--delete", branch_name], check=True)
+            Process.run(["git", "push", "origin", "--delete", branch_name], check=True)
             print(f"Deleted remote branch '{branch_name}' in {repo_path}")
 
+        except (subprocess.TimeoutExpired, Cancelled):
+            raise
         except subprocess.CalledProcessError as e:
             print(f"Error in {repo_path}: {e}")
         except Exception as e:
             print(f"Unexpected error in {repo_path}: {e}")
 
+    @staticmethod
+    def push_refspecs(repo_path, refspecs, atomic=True):
+        """
+        Push several refspecs to origin in a single `git push`.
+        Uses '--atomic' when requested and falls back to a plain push if the remote does not support it.
+        Returns True if the push succeeded.
+        """
+        if not refspecs:
+            return True
+
+        command = ["git", "push", "origin"] + list(refspecs)
+        if atomic:
+            command.insert(2, "--atomic")
+
+        result = Process.run(command, cwd=repo_path, capture_output=True, text=True)
+
+        # Older servers reject '--atomic' outright, retry once without it
+        if atomic and result.returncode != 0 and "does not support --atomic" in result.stderr:
+            print(f"Remote for {repo_path} does not support atomic pushes, retrying without '--atomic'.")
+            command.remove("--atomic")
+            result = Process.run(command, cwd=repo_path, capture_output=True, text=True)
+
+        if result.returncode != 0:
+            print(f"Error pushing {len(refspecs)} ref(s) in {repo_path}: {result.stderr.strip()}")
+            return False
+
+        return True
+
+    @staticmethod
+    def create_remote_branches(repo_path, branch_names, source_ref="HEAD"):
+        """
+        Create branches on the remote from 'source_ref' without checking anything out locally.
+        All branches are created with one push.
+        """
+        if not os.path.isdir(os.path.join(repo_path, ".git")):
+            print(f"Skipping {repo_path}: Not a Git repository.")
+            return False
+
+        refspecs = [f"{source_ref}:refs/heads/{name}" for name in branch_names]
+        if GitHubActions.push_refspecs(repo_path, refspecs):
+            print(f"Created remote branch(es) {', '.join(branch_names)} from '{source_ref}' in {repo_path}")
+            return True
+        return False
+
+    @staticmethod
+    def delete_remote_branches(repo_path, branch_names):
+        """
+        Delete branches on the remote without touching the local checkout.
+        All branches are deleted with one push.
+        """
+        if not os.path.isdir(os.path.join(repo_path, ".git")):
+            print(f"Skipping {repo_path}: Not a Git repository.")
+            return False
+
+        refspecs = [f":refs/heads/{name}" for name in branch_names]
+        if GitHubActions.push_refspecs(repo_path, refspecs):
+            print(f"Deleted remote branch(es) {', '.join(branch_names)} in {repo_path}")
+            return True
+        return False
+
+    @staticmethod
+    def list_remote_branches(repo_path):
+        """
+        List the branches on origin with a single `git ls-remote`.
+        Returns a tuple of (default_branch, {branch_name: sha}).
+        """
+        result = Process.run(["git", "ls-remote", "--symref", "origin", "HEAD", "refs/heads/*"],
+                             cwd=repo_path, capture_output=True, text=True, check=True)
+
+        default_branch = None
+        branches = {}
+        for line in result.stdout.splitlines():
+            if line.startswith("ref: "):
+                # Symref line: "ref: refs/heads/master\tHEAD"
+                target = line[len("ref: "):].split("\t")[0]
+                default_branch = target[len("refs/heads/"):]
+                continue
+            sha, _, ref = line.partition("\t")
+            if ref.startswith("refs/heads/"):
+                branches[ref[len("refs/heads/"):]] = sha
+
+        return default_branch, branches
+
     @staticmethod
     def stage_commit_and_push(repo_path, commit_message):
         """
@@ -121,20 +217,61 @@ class GitHubActions:
                 print(f"Skipping {repo_path}: Not a Git repository.")
                 return
 
+            # Skip clean repositories; the worktree itself is checked, since edits there don't touch .git
+            status = Process.run(["git", "status", "--porcelain"], capture_output=True, text=True, check=True)
+            if not status.stdout.strip():
+                print(f"Skipping {repo_path}: No changes to commit.")
+                return
+
             # Stage all changes
-            subprocess.run(["git", "add", "."], check=True)
+            Process.run(["git", "add", "."], check=True)
 
             # Commit the changes
-            subprocess.run(["git", "commit", "-m", commit_message], check=True)
+            Process.run(["git", "commit", "-m", commit_message], check=True)
 
             # Push the changes
-            subprocess.run(["git", "push"], check=True)
+            Process.run(["git", "push"], check=True)
             print(f"Pushed changes in {repo_path}")
+        except (subprocess.TimeoutExpired, Cancelled):
+            raise
         except subprocess.CalledProcessError as e:
             print(f"Error in {repo_path}: {e}")
         except Exception as e:
             print(f"Unexpected error in {repo_path}: {e}")
 
+    @staticmethod
+    def get_owner_repo(repo_path):
+        """
+        Return (owner, repo) parsed from the origin URL of the repository,
+        or None if the remote does not point at GitHub Enterprise.
+        """
+        # Get the remote URL of the repository
+        remote_url = Process.run(["git", "config", "--get", "remote.origin.url"], cwd=repo_path,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+
+        # Extract owner and repo name from the remote URL
+        if remote_url.startswith(GITHUB_API_URL):
+            # HTTPS URL format: https://GITHUB_API_URL/owner/repo.git
+            parts = remote_url[len(GITHUB_API_URL):].strip("/").split("/")  # Remove base URL and split
+        elif remote_url.startswith(f"git@{GITHUB_API_URL.split('//')[1]}:"):
+            # SSH URL format: git@GITHUB_API_URL:owner/repo.git
+            parts = remote_url.split(":")[-1].split("/")  # Extract owner and repo
+        else:
+            return None
+
+        owner, repo = parts[-2], parts[-1]
+        if repo.endswith(".git"):
+            repo = repo[:-4]  # Remove .git from repo name
+        return owner, repo
+
+    @staticmethod
+    def get_client(github_token):
+        """
+        Return a PyGithub client authenticated against GitHub Enterprise.
+        """
+        auth = Auth.Token(github_token)
+        return Github(base_url=f"{GITHUB_API_URL}/api/v3", auth=auth)
+
     # @staticmethod
     # def create_pull_request(repo_path, branch_name, pr_title, pr_description, github_token):
     #     """
@@ -193,25 +330,14 @@ class GitHubActions:
         Create a Pull Request using the PyGithub library for GitHub Enterprise.
         """
         try:
-            # Get the remote URL of the repository
-            remote_url = subprocess.check_output(["git", "config", "--get", "remote.origin.url"]).decode().strip()
-            
-            # Extract owner and repo name from the remote URL
-            if remote_url.startswith(GITHUB_API_URL):
-                # HTTPS URL format: https://GITHUB_API_URL/owner/repo.git
-                parts = remote_url[len(GITHUB_API_URL):].strip("/").split("/")  # Remove base URL and split
-                owner, repo = parts[-2], parts[-1][:-4]  # Remove .git from repo name
-            elif remote_url.startswith(f"git@{GITHUB_API_URL.split('//')[1]}:"):
-                # SSH URL format: git@GITHUB_API_URL:owner/repo.git
-                parts = remote_url.split(":")[-1].split("/")  # Extract owner and repo
-                owner, repo = parts[-2], parts[-1][:-4]  # Remove .git from repo name
-            else:
+            owner_repo = GitHubActions.get_owner_repo(repo_path)
+            if not owner_repo:
                 print(f"Skipping {repo_path}: Unsupported remote URL format.")
                 return
-            
+            owner, repo = owner_repo
+
             # Authenticate with GitHub Enterprise
-            auth = Auth.Token(github_token)
-            g = Github(base_url=f"{GITHUB_API_URL}/api/v3", auth=auth)
+            g = GitHubActions.get_client(github_token)
             
             # Get the repository object
             repository = g.get_repo(f"{owner}/{repo}")
@@ -226,7 +352,10 @@ class GitHubActions:
             
             print(f"Created PR for branch '{branch_name}' in {repo_path}")
             print(f"PR URL: {pr.html_url}")
+            return pr.html_url
         
+        except (subprocess.TimeoutExpired, Cancelled):
+            raise
         except Exception as e:
             print(f"Error creating PR in {repo_path}: {e}")
 
@@ -250,12 +379,14 @@ class GitHubActions:
                 return
 
             # Fetch the latest changes from the remote
-            subprocess.run(["git", "fetch", "origin"], check=True)
+            Process.run(["git", "fetch", "origin"], check=True)
 
             # Revert 'package-lock.json' to the version in 'master'
-            subprocess.run(["git", "checkout", "origin/master", "--", "package-lock.json"], check=True)
+            Process.run(["git", "checkout", "origin/master", "--", "package-lock.json"], check=True)
             print(f"Reverted 'package-lock.json' to 'master' version in {repo_path}")
 
+        except (subprocess.TimeoutExpired, Cancelled):
+            raise
         except subprocess.CalledProcessError as e:
             print(f"Error in {repo_path}: {e}")
         except Exception as e:
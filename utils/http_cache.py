@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from requests.structures import CaseInsensitiveDict
+from github.Requester import Requester, HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass
+from .cache import Cache
+
+class HttpCache:
+    """
+    On-disk cache of GitHub REST responses, keyed by URL and credentials.
+    GET requests are sent with If-None-Match / If-Modified-Since, and 304 responses
+    (which do not count against the rate limit) are answered from disk.
+    """
+
+    max_age = 7 * 24 * 3600
+    max_size = 100 * 1024 * 1024
+    stats = {"hits": 0, "misses": 0, "uncached": 0}
+    _stats_lock = threading.Lock()
+
+    @staticmethod
+    def enable(max_age=None, max_size=None):
+        """
+        Route every PyGithub request through the caching connection classes.
+        """
+        if max_age is not None:
+            HttpCache.max_age = max_age
+        if max_size is not None:
+            HttpCache.max_size = max_size
+        HttpCache.prune()
+        Requester.injectConnectionClasses(CachingHTTPConnection, CachingHTTPSConnection)
+
+    @staticmethod
+    def disable():
+        Requester.resetConnectionClasses()
+
+    @staticmethod
+    def _key(url, headers):
+        # Responses depend on who is asking and in which media type
+        identity = json.dumps([url, headers.get("Authorization", ""), headers.get("Accept", "")])
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    @staticmethod
+    def _path(key):
+        return os.path.join(Cache.path("http"), f"{key}.json")
+
+    @staticmethod
+    def load(url, headers):
+        try:
+            with open(HttpCache._path(HttpCache._key(url, headers)), 'r') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if time.time() - entry["stored_at"] > HttpCache.max_age:
+            return None
+        return entry
+
+    @staticmethod
+    def store(url, headers, response_headers, body):
+        entry = {
+            "url": url,
+            "stored_at": time.time(),
+            "headers": dict(response_headers),
+            "body": body,
+        }
+        path = HttpCache._path(HttpCache._key(url, headers))
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def count(result):
+        with HttpCache._stats_lock:
+            HttpCache.stats[result] += 1
+
+    @staticmethod
+    def prune():
+        """
+        Drop entries older than max_age, then the oldest entries until the cache fits in max_size.
+        """
+        directory = Cache.path("http")
+        entries = []
+        now = time.time()
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            if now - stat.st_mtime > HttpCache.max_age:
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= HttpCache.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+    @staticmethod
+    def report():
+        """
+        Print how many GitHub requests were served from the cache.
+        """
+        conditional = HttpCache.stats["hits"] + HttpCache.stats["misses"]
+        if not conditional:
+            return
+        hit_rate = 100 * HttpCache.stats["hits"] / conditional
+        print(f"GitHub API cache: {HttpCache.stats['hits']} of {conditional} GET requests "
+              f"served from cache ({hit_rate:.0f}%), {HttpCache.stats['uncached']} other requests.")
+
+class CachedResponse:
+    # mimic github.Requester.RequestsResponse for a body served from disk
+    def __init__(self, entry, revalidation_headers):
+        self.status = 200
+        self.headers = CaseInsensitiveDict(entry["headers"])
+        # Keep the fresh rate-limit and date headers from the 304
+        self.headers.update(revalidation_headers)
+        self.body = entry["body"]
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self):
+        return self.body
+
+    def iter_content(self, chunk_size=1):
+        data = self.body.encode()
+        size = chunk_size or len(data) or 1
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+
+    def raise_for_status(self):
+        pass
+
+class _CachingConnectionMixin:
+    """
+    Adds conditional GET caching to PyGithub's requests-based connection classes.
+    PyGithub builds a new connection per request once connection classes are injected,
+    so the underlying requests.Session is shared per host to keep connections alive.
+    """
+
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, host, port=None, *args, **kwargs):
+        super().__init__(host, port, *args, **kwargs)
+        key = (self.protocol, self.host, self.port)
+        with _CachingConnectionMixin._sessions_lock:
+            shared = _CachingConnectionMixin._sessions.get(key)
+            if shared is None:
+                _CachingConnectionMixin._sessions[key] = self.session
+            else:
+                self.session.close()
+                self.session = shared
+
+    def getresponse(self):
+        if self.verb.upper() != "GET" or self.stream:
+            HttpCache.count("uncached")
+            return super().getresponse()
+
+        url = f"{self.protocol}://{self.host}:{self.port}{self.url}"
+        request_headers = dict(self.headers)
+        entry = HttpCache.load(url, request_headers)
+        if entry:
+            etag = CaseInsensitiveDict(entry["headers"]).get("ETag")
+            last_modified = CaseInsensitiveDict(entry["headers"]).get("Last-Modified")
+            if etag:
+                self.headers["If-None-Match"] = etag
+            if last_modified:
+                self.headers["If-Modified-Since"] = last_modified
+
+        response = super().getresponse()
+
+        if response.status == 304 and entry:
+            HttpCache.count("hits")
+            return CachedResponse(entry, response.headers)
+
+        HttpCache.count("misses")
+        if response.status == 200 and ("ETag" in response.headers or "Last-Modified" in response.headers):
+            HttpCache.store(url, request_headers, response.headers, response.read())
+        return response
+
+    def close(self):
+        # The session is shared with later connections to the same host
+        pass
+
+class CachingHTTPConnection(_CachingConnectionMixin, HTTPRequestsConnectionClass):
+    pass
+
+class CachingHTTPSConnection(_CachingConnectionMixin, HTTPSRequestsConnectionClass):
+    pass
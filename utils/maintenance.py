@@ -0,0 +1,159 @@
+import os
+import json
+import time
+from .fleet import Fleet, DEFAULT_WORKERS
+from .process import Process
+from .run_history import RunHistory
+
+# (name, git arguments) run in order; a failing step is reported and the rest still run
+MAINTENANCE_STEPS = [
+    # Pack loose objects (the task also drops the loose copies), then roll small packs together without rewriting the big one
+    ("loose objects", ["maintenance", "run", "--task=loose-objects"]),
+    ("incremental repack", ["maintenance", "run", "--task=incremental-repack"]),
+    ("multi-pack-index", ["multi-pack-index", "write"]),
+    ("commit-graph", ["commit-graph", "write", "--reachable", "--changed-paths"]),
+    ("untracked cache", ["update-index", "--untracked-cache"]),
+]
+
+class Maintenance:
+    _git_version = None
+    _fsmonitor_supported = None
+
+    @staticmethod
+    def git_version():
+        """
+        Return the installed git version as a tuple of ints, e.g. (2, 39, 5).
+        """
+        if Maintenance._git_version is None:
+            output = Process.run(["git", "--version"], capture_output=True, text=True, check=True).stdout
+            version = output.split()[2]
+            Maintenance._git_version = tuple(int(part) for part in version.split(".")[:3] if part.isdigit())
+        return Maintenance._git_version
+
+    @staticmethod
+    def fsmonitor_supported():
+        """
+        Return True if this git was built with the fsmonitor daemon, which is not available on every platform.
+        """
+        if Maintenance._fsmonitor_supported is None:
+            output = Process.run(["git", "version", "--build-options"], capture_output=True, text=True).stdout
+            Maintenance._fsmonitor_supported = "fsmonitor--daemon" in output
+        return Maintenance._fsmonitor_supported
+
+    @staticmethod
+    def repo_size(repo_path):
+        """
+        Return the object store size in KiB (loose plus packed) and the number of loose objects and packs.
+        """
+        result = Process.run(["git", "count-objects", "-v"], cwd=repo_path, capture_output=True, text=True, check=True)
+        counts = {}
+        for line in result.stdout.splitlines():
+            name, _, value = line.partition(": ")
+            counts[name] = int(value)
+        return {"kib": counts.get("size", 0) + counts.get("size-pack", 0),
+                "loose": counts.get("count", 0), "packs": counts.get("packs", 0)}
+
+    @staticmethod
+    def time_status(repo_path, runs=3):
+        """
+        Return the fastest of 'runs' timings of a plain 'git status', in seconds.
+        """
+        timings = []
+        for _ in range(runs):
+            started_at = time.perf_counter()
+            Process.run(["git", "status", "--porcelain"], cwd=repo_path, capture_output=True, check=True)
+            timings.append(time.perf_counter() - started_at)
+        return min(timings)
+
+    @staticmethod
+    def maintain_repo(repo_path, fsmonitor=False):
+        """
+        Repack, index and configure one repository so later git commands run faster.
+        With 'fsmonitor', core.fsmonitor is also turned on; git then keeps a daemon running per repository.
+        Returns its sizes and 'git status' timings before and after, and any steps that failed or were skipped.
+        """
+        before = Maintenance.repo_size(repo_path)
+        status_before = Maintenance.time_status(repo_path)
+        started_at = time.perf_counter()
+
+        steps = list(MAINTENANCE_STEPS)
+        skipped = []
+        if Maintenance.git_version() < (2, 29):
+            # 'git maintenance' was added in 2.29; fall back to a full repack
+            steps = [("repack", ["repack", "-d"])] + [step for step in steps if step[1][0] != "maintenance"]
+        Process.run(["git", "config", "core.untrackedCache", "true"], cwd=repo_path, check=True)
+
+        failed = {}
+        for name, args in steps:
+            result = Process.run(["git", *args], cwd=repo_path, capture_output=True, text=True)
+            if result.returncode != 0:
+                failed[name] = result.stderr.strip()
+
+        seconds = time.perf_counter() - started_at
+        after = Maintenance.repo_size(repo_path)
+        status_after = Maintenance.time_status(repo_path)
+
+        # Turned on only after timing: the daemon starts on the next git command, and its first scan is not a steady-state cost
+        if not fsmonitor:
+            skipped.append("fsmonitor (opt-in; runs a daemon per repository)")
+        elif not Maintenance.fsmonitor_supported():
+            skipped.append("fsmonitor (not supported by this git build)")
+        else:
+            Process.run(["git", "config", "core.fsmonitor", "true"], cwd=repo_path, check=True)
+            skipped.append("fsmonitor timing (enabled after 'status after' was measured)")
+        return {"before": before, "after": after, "status_before": status_before, "status_after": status_after,
+                "seconds": seconds, "failed": failed, "skipped": skipped}
+
+    @staticmethod
+    def run(parent_repo_path, workers=DEFAULT_WORKERS, fsmonitor=False):
+        """
+        Run maintain_repo on every repository under the parent folder in parallel,
+        print a before/after table and save it as JSON in the parent folder.
+        """
+        report = {}
+        history = RunHistory("maintenance")
+        results = Fleet.run_parallel(Fleet.list_repos(parent_repo_path),
+                                     lambda repo_path: Maintenance.maintain_repo(repo_path, fsmonitor),
+                                     workers=workers, report=report, history=history)
+        results = {repo_path: result for repo_path, result in sorted(results.items()) if result}
+
+        print(f"\n{'Repository':<40} {'Size before':>12} {'Size after':>12} {'Packs':>7} {'Status before':>14} {'Status after':>13}")
+        print(f"{'-'*40} {'-'*12} {'-'*12} {'-'*7} {'-'*14} {'-'*13}")
+        for repo_path, result in results.items():
+            packs = f"{result['before']['packs']}->{result['after']['packs']}"
+            print(f"{os.path.basename(repo_path):<40} {result['before']['kib'] / 1024:>9.1f} MB {result['after']['kib'] / 1024:>9.1f} MB "
+                  f"{packs:>7} {result['status_before'] * 1000:>11.0f} ms {result['status_after'] * 1000:>10.0f} ms")
+
+        size_before = sum(result["before"]["kib"] for result in results.values())
+        size_after = sum(result["after"]["kib"] for result in results.values())
+        status_before = sum(result["status_before"] for result in results.values())
+        status_after = sum(result["status_after"] for result in results.values())
+        print(f"\nMaintained {len(results)} repositories: {size_before / 1024:.1f} MB -> {size_after / 1024:.1f} MB, "
+              f"git status {status_before * 1000:.0f} ms -> {status_after * 1000:.0f} ms in total")
+
+        failed = {repo_path: result["failed"] for repo_path, result in results.items() if result["failed"]}
+        if failed:
+            print(f"\nSteps failed in {len(failed)} repositories:")
+            for repo_path, steps in failed.items():
+                for name, error in steps.items():
+                    print(f"    {repo_path}: {name}: {error}")
+        skipped = sorted({step for result in results.values() for step in result["skipped"]})
+        if skipped:
+            print(f"\nSkipped: {', '.join(skipped)}")
+
+        history.print_summary()
+        Fleet.print_report(report)
+
+        result_file = os.path.join(parent_repo_path, "maintenance_report.json")
+        try:
+            with open(result_file, 'w') as f:
+                json.dump({"summary": {"repositories": len(results), "size_before_kib": size_before,
+                                       "size_after_kib": size_after, "timed_out": report["timed_out"],
+                                       "failed": report["failed"], "cancelled": report["cancelled"],
+                                       "fsmonitor": fsmonitor},
+                           "repositories": results}, f, indent=2)
+            print(f"\nDetailed report saved to: {result_file}")
+        except Exception as e:
+            print(f"Error saving report file: {e}")
+
+        return results
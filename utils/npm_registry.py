@@ -0,0 +1,141 @@
+import os
+import re
+import json
+import time
+import base64
+import hashlib
+import threading
+import requests
+from urllib.parse import quote, urlsplit
+from .cache import Cache
+from .fleet import Fleet, DEFAULT_WORKERS
+
+DEFAULT_REGISTRY = "https://registry.npmjs.org"
+
+class NpmRegistry:
+    """
+    Fetches package metadata from an npm registry (or a local mirror) with an on-disk TTL cache,
+    so each package is requested at most once per TTL no matter how many repositories use it.
+    """
+
+    def __init__(self, registry=None, ttl=3600, timeout=30):
+        config = NpmRegistry.config()
+        self.registry = (registry or config.get("registry") or DEFAULT_REGISTRY).rstrip("/")
+        self.ttl = ttl
+        self.timeout = timeout
+        self.stats = {"cached": 0, "fetched": 0}
+        self._stats_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(NpmRegistry.auth_headers(self.registry, config))
+        registry_key = hashlib.sha256(self.registry.encode()).hexdigest()[:16]
+        self.cache_dir = Cache.path("npm_metadata", registry_key)
+
+    @staticmethod
+    def read_npmrc(path):
+        """
+        Parse one .npmrc file into a dict, expanding ${VAR} references. Returns {} if it does not exist.
+        """
+        settings = {}
+        try:
+            with open(path, 'r') as f:
+                lines = f.read().splitlines()
+        except (FileNotFoundError, IsADirectoryError):
+            return settings
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith(("#", ";")):
+                continue
+            key, separator, value = line.partition("=")
+            if not separator:
+                continue
+            value = value.strip().strip('"').strip("'")
+            settings[key.strip()] = re.sub(r"\$\{([^}]+)\}", lambda match: os.environ.get(match.group(1), ""), value)
+        return settings
+
+    @staticmethod
+    def config(project_path=None):
+        """
+        Return the npm settings that apply in 'project_path', with npm's precedence:
+        npm_config_* environment variables over the project's .npmrc over the user's.
+        """
+        config = NpmRegistry.read_npmrc(os.environ.get("npm_config_userconfig") or os.path.expanduser("~/.npmrc"))
+        if project_path:
+            config.update(NpmRegistry.read_npmrc(os.path.join(project_path, ".npmrc")))
+        for name, value in os.environ.items():
+            if name.lower().startswith("npm_config_") and name.lower() != "npm_config_userconfig":
+                config[name[len("npm_config_"):].lower().replace("_", "-")] = value
+        return config
+
+    @staticmethod
+    def registry_for(name, config):
+        """
+        Return the registry npm would use for a package: its scope's registry, else the default one.
+        """
+        scope = name.split("/")[0] if name.startswith("@") else None
+        return (config.get(f"{scope}:registry") or config.get("registry") or DEFAULT_REGISTRY).rstrip("/")
+
+    @staticmethod
+    def auth_headers(url, config):
+        """
+        Return the Authorization header for 'url' from the most specific "//host/path/:_authToken"
+        (or ":_auth", or ":username" with ":_password") setting that covers it, or {} if none does.
+        """
+        parts = urlsplit(url)
+        target = f"//{parts.netloc}{parts.path}"
+        prefixes = sorted({key.rpartition(":")[0] for key in config if key.startswith("//")}, key=len, reverse=True)
+        for prefix in prefixes:
+            if not target.startswith(prefix.rstrip("/") + "/"):
+                continue
+            if config.get(f"{prefix}:_authToken"):
+                return {"Authorization": f"Bearer {config[f'{prefix}:_authToken']}"}
+            if config.get(f"{prefix}:_auth"):
+                return {"Authorization": f"Basic {config[f'{prefix}:_auth']}"}
+            if config.get(f"{prefix}:username") and config.get(f"{prefix}:_password"):
+                password = base64.b64decode(config[f"{prefix}:_password"]).decode()
+                credentials = base64.b64encode(f"{config[f'{prefix}:username']}:{password}".encode()).decode()
+                return {"Authorization": f"Basic {credentials}"}
+        return {}
+
+    def _count(self, result):
+        with self._stats_lock:
+            self.stats[result] += 1
+
+    def _cache_file(self, name):
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(name.encode()).hexdigest()}.json")
+
+    def metadata(self, name):
+        """
+        Return {"versions": [...], "dist-tags": {...}} for a package, or None if the registry does not know it.
+        Raises requests.RequestException (including requests.Timeout) if the registry cannot be reached.
+        """
+        cache_file = self._cache_file(name)
+        try:
+            if time.time() - os.path.getmtime(cache_file) < self.ttl:
+                with open(cache_file, 'r') as f:
+                    metadata = json.load(f)
+                self._count("cached")
+                return metadata
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        # Abbreviated metadata only carries what version resolution needs
+        response = self.session.get(f"{self.registry}/{quote(name, safe='@')}",
+                                    headers={"Accept": "application/vnd.npm.install-v1+json"}, timeout=self.timeout)
+        self._count("fetched")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        document = response.json()
+        metadata = {"versions": list(document.get("versions", {})), "dist-tags": document.get("dist-tags", {})}
+
+        temp_path = f"{cache_file}.tmp{os.getpid()}"
+        with open(temp_path, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(temp_path, cache_file)
+        return metadata
+
+    def metadata_for(self, names, workers=DEFAULT_WORKERS):
+        """
+        Fetch metadata for many packages in parallel. Returns a dict of name -> metadata (or None).
+        """
+        return Fleet.run_parallel(sorted(names), self.metadata, workers=workers)
@@ -0,0 +1,446 @@
+import io
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import shutil
+import tarfile
+import platform
+import tempfile
+import threading
+import subprocess
+import requests
+from .cache import Cache
+from .fleet import Fleet, DEFAULT_WORKERS
+from .process import Process
+from .npm_registry import NpmRegistry, DEFAULT_REGISTRY
+
+# Strongest first; npm writes sha512 for everything it has published since 2017
+INTEGRITY_ALGORITHMS = ("sha512", "sha384", "sha256", "sha1")
+
+# Lifecycle scripts npm runs for the project itself after installing its dependencies
+ROOT_INSTALL_SCRIPTS = ("preinstall", "install", "postinstall", "prepare")
+
+class PackageStore:
+    """
+    A content-addressed store of extracted package versions shared by every repository.
+    node_modules is rebuilt from package-lock.json by hardlinking files out of the store
+    (copying when hardlinks fail), so each package version is downloaded and kept on disk once.
+    """
+
+    def __init__(self, root=None, workers=DEFAULT_WORKERS):
+        self.root = root or Cache.path("store")
+        self.workers = workers
+        self.session = requests.Session()
+        self.stats = {"projects": 0, "fallbacks": 0, "packages": 0, "fetched": 0, "reused": 0,
+                      "linked": 0, "copied": 0, "seconds": 0.0, "fetch_seconds_saved": 0.0}
+        self._lock = threading.Lock()
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self.stats[name] += value
+
+    @staticmethod
+    def key_for(integrity):
+        """
+        Return the store key ("sha512-<hex>") for an SRI integrity string, or None if it has no usable hash.
+        """
+        hashes = {}
+        for item in (integrity or "").split():
+            algorithm, _, digest = item.partition("-")
+            if algorithm in INTEGRITY_ALGORITHMS and digest:
+                hashes[algorithm] = digest
+        for algorithm in INTEGRITY_ALGORITHMS:
+            if algorithm in hashes:
+                return f"{algorithm}-{base64.b64decode(hashes[algorithm]).hex()}"
+        return None
+
+    def entry_path(self, key):
+        algorithm, _, digest = key.partition("-")
+        return os.path.join(self.root, "packages", digest[:2], key)
+
+    @staticmethod
+    def _platform_matches(values, current):
+        # npm's os/cpu fields: a list of allowed values, or "!value" exclusions
+        if not values:
+            return True
+        if isinstance(values, str):
+            values = [values]
+        if f"!{current}" in values:
+            return False
+        allowed = [value for value in values if not value.startswith("!")]
+        return not allowed or current in allowed
+
+    @staticmethod
+    def _current_cpu():
+        machine = platform.machine().lower()
+        return {"x86_64": "x64", "amd64": "x64", "aarch64": "arm64", "i386": "ia32", "i686": "ia32"}.get(machine, machine)
+
+    def packages_from_lock(self, lock_data):
+        """
+        Return {install path: lock entry} for every package in a lockfileVersion 2/3 lockfile that
+        should be installed on this platform, or None if some package cannot come from the store
+        (lockfileVersion 1, workspaces, git or file: dependencies).
+        """
+        if lock_data.get("lockfileVersion", 1) < 2 or "packages" not in lock_data:
+            return None
+
+        packages = {}
+        for path, entry in lock_data["packages"].items():
+            if not path:
+                continue
+            # Bundled dependencies arrive inside their parent's tarball
+            if entry.get("inBundle"):
+                continue
+            if entry.get("link") or not self.key_for(entry.get("integrity")) or not entry.get("resolved"):
+                return None
+            if entry.get("optional") and not (self._platform_matches(entry.get("os"), sys.platform)
+                                              and self._platform_matches(entry.get("cpu"), self._current_cpu())):
+                continue
+            packages[path] = entry
+        return packages
+
+    @staticmethod
+    def bin_targets(path, entry):
+        """
+        Return {command name: file inside the package} for the executables a package installed at 'path' provides.
+        """
+        bins = entry.get("bin")
+        if not bins:
+            return {}
+        if isinstance(bins, str):
+            name = entry.get("name") or path.rsplit("node_modules/", 1)[-1]
+            bins = {name.split("/")[-1]: bins}
+        return bins
+
+    @staticmethod
+    def tarball_url(path, entry, config):
+        """
+        Return the URL to download a package from. Like npm, tarballs locked against the public
+        registry are fetched from the registry configured for the package's scope instead.
+        """
+        resolved = entry["resolved"]
+        registry = NpmRegistry.registry_for(entry.get("name") or path.rsplit("node_modules/", 1)[-1], config)
+        if (config.get("replace-registry-host", "npmjs") != "never" and registry != DEFAULT_REGISTRY
+                and resolved.startswith(f"{DEFAULT_REGISTRY}/")):
+            return registry + resolved[len(DEFAULT_REGISTRY):]
+        return resolved
+
+    def fetch(self, path, entry, config=None):
+        """
+        Download a package tarball with the registry and credentials from 'config' (see NpmRegistry.config),
+        check it against its integrity hash and extract it into the store.
+        Returns the store key; does nothing if the entry is already there.
+        """
+        key = self.key_for(entry["integrity"])
+        destination = self.entry_path(key)
+        if os.path.isdir(destination):
+            return key
+
+        started = time.monotonic()
+        config = config or {}
+        url = self.tarball_url(path, entry, config)
+        response = self.session.get(url, headers=NpmRegistry.auth_headers(url, config), timeout=60)
+        response.raise_for_status()
+        algorithm = key.partition("-")[0]
+        digest = hashlib.new(algorithm, response.content).hexdigest()
+        if f"{algorithm}-{digest}" != key:
+            raise ValueError(f"Integrity check failed for {entry['resolved']}")
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=os.path.dirname(destination))
+        try:
+            with tarfile.open(fileobj=io.BytesIO(response.content), mode="r:*") as tar:
+                for member in tar:
+                    # Tarballs normally wrap everything in "package/"; drop whatever the top folder is
+                    parts = member.name.replace("\\", "/").split("/")[1:]
+                    if not parts or ".." in parts or member.name.startswith("/"):
+                        continue
+                    target = os.path.join(temp_dir, *parts)
+                    if member.isdir():
+                        os.makedirs(target, exist_ok=True)
+                    elif member.isfile():
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        with tar.extractfile(member) as source, open(target, "wb") as f:
+                            shutil.copyfileobj(source, f)
+                        # Store files are shared, so they are never writable
+                        os.chmod(target, 0o555 if member.mode & 0o111 else 0o444)
+
+            # npm makes bins executable on install; do it once here, since installed files are hardlinks to these
+            for target in self.bin_targets(path, entry).values():
+                target_path = os.path.normpath(os.path.join(temp_dir, target))
+                if target_path.startswith(temp_dir + os.sep) and os.path.isfile(target_path):
+                    os.chmod(target_path, 0o555)
+
+            os.chmod(temp_dir, 0o755)
+            with open(f"{temp_dir}.json", "w") as f:
+                json.dump({"resolved": entry["resolved"], "version": entry.get("version"),
+                           "fetch_seconds": time.monotonic() - started}, f)
+            os.replace(f"{temp_dir}.json", f"{destination}.json")
+            try:
+                os.rename(temp_dir, destination)
+            except OSError:
+                # Another repository fetched the same package at the same time
+                pass
+        finally:
+            if os.path.isdir(temp_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        self._count(fetched=1)
+        return key
+
+    def _fetch_seconds(self, key):
+        try:
+            with open(f"{self.entry_path(key)}.json", "r") as f:
+                return json.load(f).get("fetch_seconds", 0.0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0.0
+
+    def link_package(self, key, destination, copy=False):
+        """
+        Recreate a store entry at 'destination' with hardlinks, falling back to copies.
+        Returns (files linked, files copied).
+        """
+        source_root = self.entry_path(key)
+        linked = copied = 0
+        for directory, _, files in os.walk(source_root):
+            target_dir = os.path.join(destination, os.path.relpath(directory, source_root))
+            os.makedirs(target_dir, exist_ok=True)
+            for name in files:
+                source = os.path.join(directory, name)
+                target = os.path.join(target_dir, name)
+                if not copy:
+                    try:
+                        os.link(source, target)
+                        linked += 1
+                        continue
+                    except OSError:
+                        # Different filesystem, link limit reached, or links not permitted
+                        pass
+                shutil.copyfile(source, target)
+                os.chmod(target, os.stat(source).st_mode | 0o200)
+                copied += 1
+        return linked, copied
+
+    @staticmethod
+    def link_bins(repo_path, path, entry):
+        """
+        Create the node_modules/.bin symlinks for a package installed at 'path'.
+        """
+        bins = PackageStore.bin_targets(path, entry)
+        if not bins:
+            return
+
+        # Bins go in the node_modules folder the package itself sits in
+        parent = path[:path.rfind("node_modules/") + len("node_modules")]
+        bin_dir = os.path.join(repo_path, parent, ".bin")
+        os.makedirs(bin_dir, exist_ok=True)
+        for name, target in bins.items():
+            link_path = os.path.join(bin_dir, name)
+            target_path = os.path.normpath(os.path.join(repo_path, path, target))
+            if os.path.lexists(link_path):
+                os.remove(link_path)
+            os.symlink(os.path.relpath(target_path, bin_dir), link_path)
+
+    def _register(self, repo_path):
+        # Projects installed from the store; their lockfiles are the GC roots
+        with self._lock:
+            projects = self.projects()
+            if repo_path in projects:
+                return
+            projects.append(repo_path)
+            projects_file = os.path.join(self.root, "projects.json")
+            with open(f"{projects_file}.tmp", "w") as f:
+                json.dump(sorted(projects), f, indent=2)
+            os.replace(f"{projects_file}.tmp", projects_file)
+
+    def projects(self):
+        try:
+            with open(os.path.join(self.root, "projects.json"), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def install(self, repo_path):
+        """
+        Rebuild node_modules from package-lock.json out of the store, fetching missing packages
+        with the project's npm registry and credentials. Packages with install scripts get copies
+        rather than hardlinks, since their scripts write into the package folder. Returns a summary
+        dict, or None if the lockfile cannot be installed from the store (or a package could not be
+        downloaded) and a regular npm install is needed.
+        """
+        started = time.monotonic()
+        lock_path = os.path.join(repo_path, "package-lock.json")
+        try:
+            with open(lock_path, "r") as f:
+                lock_data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        packages = self.packages_from_lock(lock_data)
+        if packages is None:
+            return None
+
+        missing = [(path, entry) for path, entry in packages.items()
+                   if not os.path.isdir(self.entry_path(self.key_for(entry["integrity"])))]
+        unique_missing = {entry["integrity"]: (path, entry) for path, entry in missing}
+        config = NpmRegistry.config(repo_path)
+        fetch_report = {}
+        Fleet.run_parallel(list(unique_missing), lambda integrity: self.fetch(*unique_missing[integrity], config),
+                           workers=self.workers, report=fetch_report)
+        if fetch_report["timed_out"] or fetch_report["cancelled"]:
+            raise RuntimeError(f"Could not fetch {len(fetch_report['timed_out'])} packages into the store")
+        if fetch_report["failed"]:
+            # e.g. a registry that needs settings this reader does not understand; npm knows them all
+            return None
+
+        shutil.rmtree(os.path.join(repo_path, "node_modules"), ignore_errors=True)
+        linked = copied = 0
+        fetch_seconds_saved = 0.0
+        fetched_keys = {self.key_for(integrity) for integrity in unique_missing}
+        # Parents first, so nested node_modules land inside an existing package folder
+        for path in sorted(packages, key=lambda p: p.count("node_modules/")):
+            entry = packages[path]
+            key = self.key_for(entry["integrity"])
+            package_linked, package_copied = self.link_package(key, os.path.join(repo_path, path),
+                                                               copy=bool(entry.get("hasInstallScript")))
+            linked += package_linked
+            copied += package_copied
+            if key not in fetched_keys:
+                fetch_seconds_saved += self._fetch_seconds(key)
+        for path, entry in packages.items():
+            self.link_bins(repo_path, path, entry)
+
+        self._register(os.path.abspath(repo_path))
+        seconds = time.monotonic() - started
+        self._count(projects=1, packages=len(packages), reused=len(packages) - len(missing),
+                    linked=linked, copied=copied, seconds=seconds, fetch_seconds_saved=fetch_seconds_saved)
+        return {"packages": len(packages), "fetched": len(unique_missing), "linked": linked, "copied": copied,
+                "seconds": seconds, "scripts": sorted(path.rsplit("node_modules/", 1)[-1] for path, entry in packages.items()
+                                                      if entry.get("hasInstallScript"))}
+
+    def install_project(self, repo_path):
+        """
+        Install a project's dependencies from the store: resolve package-lock.json if it is missing,
+        link node_modules, then run the install scripts npm would have run.
+        Falls back to a regular npm install when the lockfile cannot be served from the store.
+        Returns (returncode, output lines).
+        """
+        lines = []
+        npm_flags = ["--no-audit", "--no-fund"]
+        if not os.path.exists(os.path.join(repo_path, "package-lock.json")):
+            lines.append("Executing: npm install --package-lock-only")
+            process = Process.run(["npm", "install", "--package-lock-only", "--ignore-scripts", *npm_flags],
+                                  text=True, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if process.returncode != 0:
+                lines.append(process.stderr)
+                return process.returncode, lines
+
+        result = self.install(repo_path)
+        if result is None:
+            self._count(fallbacks=1)
+            lines.append("Lockfile cannot be installed from the store, executing: npm install")
+            process = Process.run(["npm", "install", *npm_flags], text=True, cwd=repo_path,
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if process.returncode != 0:
+                lines.append(process.stderr)
+            return process.returncode, lines
+
+        lines.append(f"Linked {result['packages']} packages from the store ({result['fetched']} fetched, "
+                     f"{result['linked']} files hardlinked, {result['copied']} copied) in {result['seconds']:.1f}s")
+
+        commands = []
+        if result["scripts"]:
+            commands.append(["npm", "rebuild", *result["scripts"]])
+        with open(os.path.join(repo_path, "package.json"), "r") as f:
+            scripts = json.load(f).get("scripts", {})
+        commands += [["npm", "run", script] for script in ROOT_INSTALL_SCRIPTS if script in scripts]
+        for cmd in commands:
+            lines.append(f"Executing: {' '.join(cmd)}")
+            process = Process.run(cmd, text=True, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if process.returncode != 0:
+                lines.append(process.stderr)
+                return process.returncode, lines
+        return 0, lines
+
+    def usage(self):
+        """
+        Return (bytes stored, bytes referenced through hardlinks outside the store, entries).
+        """
+        stored = linked = entries = 0
+        for entry_dir in self._entries():
+            entries += 1
+            for directory, _, files in os.walk(entry_dir):
+                for name in files:
+                    stat = os.lstat(os.path.join(directory, name))
+                    stored += stat.st_size
+                    linked += stat.st_size * (stat.st_nlink - 1)
+        return stored, linked, entries
+
+    def _entries(self):
+        packages_dir = os.path.join(self.root, "packages")
+        if not os.path.isdir(packages_dir):
+            return
+        for fan_out in sorted(os.listdir(packages_dir)):
+            fan_out_dir = os.path.join(packages_dir, fan_out)
+            for name in sorted(os.listdir(fan_out_dir)):
+                # Skip metadata files and downloads still being extracted
+                if not name.endswith(".json") and not name.startswith("tmp"):
+                    yield os.path.join(fan_out_dir, name)
+
+    def print_summary(self):
+        """
+        Print what this run installed from the store, the store's dedupe ratio and the time saved.
+        """
+        stats = self.stats
+        stored, linked, entries = self.usage()
+        ratio = (stored + linked) / stored if stored else 1.0
+        print(f"\nPackage store ({self.root}):")
+        print(f"    {stats['projects']} projects installed from the store, {stats['fallbacks']} fell back to npm install")
+        print(f"    {stats['packages']} packages: {stats['reused']} reused, {stats['fetched']} fetched")
+        print(f"    {stats['linked']} files hardlinked, {stats['copied']} copied")
+        print(f"    {entries} entries, {stored / 1e6:.1f} MB on disk serving {(stored + linked) / 1e6:.1f} MB "
+              f"of node_modules (dedupe ratio {ratio:.1f}x)")
+        print(f"    Time saved: {stats['fetch_seconds_saved']:.1f}s of downloads and extraction skipped, "
+              f"{stats['seconds']:.1f}s spent linking")
+
+    def gc(self, extra_repo_paths=()):
+        """
+        Delete store entries that no registered project's package-lock.json references anymore.
+        Projects whose lockfile is gone are dropped from the registry.
+        """
+        referenced = set()
+        projects = []
+        for repo_path in sorted(set(self.projects()) | {os.path.abspath(path) for path in extra_repo_paths}):
+            try:
+                with open(os.path.join(repo_path, "package-lock.json"), "r") as f:
+                    lock_data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            projects.append(repo_path)
+            for entry in lock_data.get("packages", {}).values():
+                key = self.key_for(entry.get("integrity"))
+                if key:
+                    referenced.add(key)
+
+        removed = freed = 0
+        for entry_dir in list(self._entries()):
+            if os.path.basename(entry_dir) in referenced:
+                continue
+            for directory, _, files in os.walk(entry_dir):
+                freed += sum(os.lstat(os.path.join(directory, name)).st_size for name in files)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            if os.path.exists(f"{entry_dir}.json"):
+                os.remove(f"{entry_dir}.json")
+            removed += 1
+
+        projects_file = os.path.join(self.root, "projects.json")
+        with open(f"{projects_file}.tmp", "w") as f:
+            json.dump(projects, f, indent=2)
+        os.replace(f"{projects_file}.tmp", projects_file)
+
+        print(f"Store GC: {len(projects)} lockfiles reference {len(referenced)} entries; "
+              f"removed {removed} unreferenced entries ({freed / 1e6:.1f} MB)")
+        return removed
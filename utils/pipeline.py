@@ -0,0 +1,179 @@
+import time
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from .process import Process, Cancelled
+
+class Stage:
+    """
+    One step of a pipeline, e.g. a git push or an API call.
+    At most 'limit' items run this stage at the same time.
+    'requires' names the stages that must have succeeded first; by default a stage
+    requires every stage declared before it.
+    """
+
+    def __init__(self, name, action, limit=1, requires=None):
+        self.name = name
+        self.action = action
+        self.limit = limit
+        self.requires = requires
+
+class Pipeline:
+    """
+    Streams items through a DAG of stages, each with its own concurrency limit.
+    An item moves to its next stage as soon as it finishes the previous one, so
+    stage N of one item overlaps with stage N+1 of another.
+
+    Every stage has its own pool of 'limit' threads and queue. A finished item is queued
+    on its next stage rather than holding a thread while it waits for a free slot, so
+    items held up by a full later stage never keep earlier stages from moving ahead.
+    'max_in_flight' optionally caps how many items are between their first and last stage.
+    """
+
+    def __init__(self, stages, max_in_flight=None):
+        self.stages = self._ordered(stages)
+        self.max_in_flight = max_in_flight
+
+    @staticmethod
+    def _ordered(stages):
+        """
+        Resolve default requirements and return the stages in dependency order.
+        """
+        names = [stage.name for stage in stages]
+        for index, stage in enumerate(stages):
+            if stage.requires is None:
+                stage.requires = names[:index]
+            unknown = set(stage.requires) - set(names)
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' requires unknown stage(s): {', '.join(sorted(unknown))}")
+
+        ordered = []
+        done = set()
+        pending = list(stages)
+        while pending:
+            ready = [stage for stage in pending if set(stage.requires) <= done]
+            if not ready:
+                raise ValueError("Pipeline stages contain a cycle.")
+            for stage in ready:
+                ordered.append(stage)
+                done.add(stage.name)
+                pending.remove(stage)
+        return ordered
+
+    @staticmethod
+    def _new_outcome(cancelled=False):
+        return {"results": {}, "failed_stage": None, "error": None, "timed_out": False, "cancelled": cancelled}
+
+    def _run_stage(self, stage, item, outcome):
+        """
+        Run one stage for one item, recording its result or failure in 'outcome'. Returns True on success.
+        """
+        try:
+            outcome["results"][stage.name] = stage.action(item)
+            return True
+        except Exception as e:
+            if isinstance(e, subprocess.TimeoutExpired):
+                print(f"Timed out in stage '{stage.name}' for {item} after {e.timeout:.0f}s")
+                outcome["timed_out"] = True
+            elif isinstance(e, Cancelled):
+                outcome["cancelled"] = True
+            else:
+                print(f"Error in stage '{stage.name}' for {item}: {e}")
+            if outcome["failed_stage"] is None:
+                outcome["failed_stage"] = stage.name
+                outcome["error"] = str(e)
+            return False
+
+    def run(self, items, history=None):
+        """
+        Run every item through the pipeline.
+        Returns a dict of item -> {"results": {stage: result}, "failed_stage": name or None, "error": message or None,
+        "timed_out": bool, "cancelled": bool}. Ctrl-C kills the commands in flight and returns the partial outcomes.
+        With a RunHistory, items start longest-expected-first and their end-to-end durations are recorded.
+        """
+        items = list(dict.fromkeys(items))
+        if history is not None:
+            items = history.order(items)
+
+        executors = {stage.name: ThreadPoolExecutor(max_workers=stage.limit, thread_name_prefix=f"pipeline-{stage.name}")
+                     for stage in self.stages}
+        outcomes = {}
+        failed = {}
+        started_at = {}
+        waiting = iter(items)
+        condition = threading.Condition()
+        counts = {"in_flight": 0, "finished": 0}
+        cancelled = threading.Event()
+
+        def admit():
+            # Take the next items off the list while under max_in_flight; start them outside the lock
+            with condition:
+                admitted = []
+                while not cancelled.is_set() and (self.max_in_flight is None or counts["in_flight"] < self.max_in_flight):
+                    item = next(waiting, waiting)
+                    if item is waiting:
+                        break
+                    counts["in_flight"] += 1
+                    outcomes[item] = self._new_outcome()
+                    failed[item] = set()
+                    started_at[item] = time.perf_counter()
+                    admitted.append(item)
+            for item in admitted:
+                advance(item, 0)
+
+        def advance(item, index):
+            # Queue the item on its next stage whose requirements succeeded, or finish it
+            while index < len(self.stages) and failed[item] & set(self.stages[index].requires):
+                failed[item].add(self.stages[index].name)
+                index += 1
+            if index == len(self.stages) or cancelled.is_set():
+                finish(item, stopped=index < len(self.stages))
+            else:
+                executors[self.stages[index].name].submit(run_stage, item, index)
+
+        def run_stage(item, index):
+            stage = self.stages[index]
+            if cancelled.is_set():
+                finish(item, stopped=True)
+                return
+            if not self._run_stage(stage, item, outcomes[item]):
+                failed[item].add(stage.name)
+            advance(item, index + 1)
+
+        def finish(item, stopped=False):
+            outcome = outcomes[item]
+            outcome["cancelled"] = outcome["cancelled"] or stopped
+            # Same rules as RunHistory.timed: failed or cancelled items are not recorded. A timed-out
+            # item is, and its time already includes the full timeout of the stage that hit it
+            if history is not None and not outcome["cancelled"] and (outcome["failed_stage"] is None or outcome["timed_out"]):
+                history.record(item, time.perf_counter() - started_at[item])
+            with condition:
+                counts["in_flight"] -= 1
+                counts["finished"] += 1
+                condition.notify_all()
+            admit()
+
+        def all_finished():
+            return counts["finished"] == len(outcomes) and (cancelled.is_set() or len(outcomes) == len(items))
+
+        admit()
+        try:
+            with condition:
+                condition.wait_for(all_finished)
+        except KeyboardInterrupt:
+            print("\nCancelling, waiting for running commands to stop...")
+            cancelled.set()
+            Process.cancel_all()
+            # Queued items see the flag and finish straight away; running ones stop with their commands
+            with condition:
+                condition.wait_for(all_finished)
+            Process.reset()
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        if history is not None:
+            history.save()
+
+        # Items that were never started
+        return {item: outcomes.get(item) or self._new_outcome(cancelled=True) for item in items}
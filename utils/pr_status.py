@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import requests
+from . import github_actions
+from .fleet import Fleet
+from .github_actions import GitHubActions
+
+PR_FIELDS = """
+        number
+        url
+        state
+        isDraft
+        mergeable
+        reviewDecision
+        commits(last: 1) { nodes { commit { statusCheckRollup { state } } } }
+"""
+
+# PRs in these states no longer change, so watch mode stops polling them
+TERMINAL_STATES = {"MERGED", "CLOSED"}
+
+class PRStatus:
+    @staticmethod
+    def _build_query(targets):
+        """
+        Build one GraphQL query with an aliased 'repository' field per (owner, repo).
+        """
+        fields = []
+        for index, (owner, repo) in enumerate(targets):
+            fields.append(
+                f"  r{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{\n"
+                f"    pullRequests(headRefName: $head, first: 1, orderBy: {{field: CREATED_AT, direction: DESC}}) {{\n"
+                f"      nodes {{{PR_FIELDS}      }}\n"
+                f"    }}\n"
+                f"  }}"
+            )
+        return "query($head: String!) {\n" + "\n".join(fields) + "\n  rateLimit { cost remaining }\n}"
+
+    @staticmethod
+    def fetch(targets, branch_name, github_token, batch_size=50, timeout=60):
+        """
+        Fetch the newest PR for 'branch_name' in every (owner, repo) target,
+        using one aliased GraphQL query per batch of repositories.
+        Returns a dict of (owner, repo) -> row. Raises requests.Timeout if a batch takes longer than 'timeout' seconds.
+        """
+        url = f"{github_actions.GITHUB_API_URL}/api/graphql"
+        headers = {"Authorization": f"bearer {github_token}"}
+        rows = {}
+
+        for start in range(0, len(targets), batch_size):
+            batch = targets[start:start + batch_size]
+            response = requests.post(url, headers=headers, json={
+                "query": PRStatus._build_query(batch),
+                "variables": {"head": branch_name},
+            }, timeout=timeout)
+            response.raise_for_status()
+            payload = response.json()
+            data = payload.get("data") or {}
+
+            # Missing repositories come back as errors alongside partial data
+            for error in payload.get("errors", []):
+                print(f"GraphQL error: {error.get('message')}")
+
+            for index, (owner, repo) in enumerate(batch):
+                repository = data.get(f"r{index}")
+                nodes = repository["pullRequests"]["nodes"] if repository else []
+                row = {"repo": f"{owner}/{repo}", "number": None, "url": None, "state": "NONE",
+                       "mergeable": None, "review": None, "checks": None}
+                if nodes:
+                    pr = nodes[0]
+                    commits = pr["commits"]["nodes"]
+                    rollup = commits[0]["commit"]["statusCheckRollup"] if commits else None
+                    row.update({
+                        "number": pr["number"],
+                        "url": pr["url"],
+                        "state": "DRAFT" if pr["isDraft"] and pr["state"] == "OPEN" else pr["state"],
+                        "mergeable": pr["mergeable"],
+                        "review": pr["reviewDecision"],
+                        "checks": rollup["state"] if rollup else None,
+                    })
+                rows[(owner, repo)] = row
+
+        return rows
+
+    @staticmethod
+    def list_targets(parent_repo_path):
+        """
+        Return the (owner, repo) of every repository under the parent folder with a GitHub Enterprise remote.
+        """
+        owner_repos = Fleet.run_parallel(Fleet.list_repos(parent_repo_path), GitHubActions.get_owner_repo)
+        return sorted(owner_repo for owner_repo in owner_repos.values() if owner_repo)
+
+    @staticmethod
+    def print_table(rows):
+        print(f"{'Repository':<45} {'PR':<7} {'State':<8} {'Mergeable':<12} {'Review':<18} {'Checks'}")
+        print(f"{'-'*45} {'-'*7} {'-'*8} {'-'*12} {'-'*18} {'-'*10}")
+        for row in rows:
+            number = f"#{row['number']}" if row["number"] else "-"
+            print(f"{row['repo']:<45} {number:<7} {row['state']:<8} {row['mergeable'] or '-':<12} "
+                  f"{row['review'] or '-':<18} {row['checks'] or '-'}")
+
+    @staticmethod
+    def report(parent_repo_path, branch_name, github_token):
+        """
+        Print the PR dashboard for a head branch and save it as JSON in the parent folder.
+        """
+        rows = PRStatus.fetch(PRStatus.list_targets(parent_repo_path), branch_name, github_token)
+        PRStatus.print_table(list(rows.values()))
+
+        result_file = os.path.join(parent_repo_path, "pr_status_report.json")
+        try:
+            with open(result_file, 'w') as f:
+                json.dump({"branch": branch_name, "pull_requests": list(rows.values())}, f, indent=2)
+            print(f"\nDetailed report saved to: {result_file}")
+        except Exception as e:
+            print(f"Error saving report file: {e}")
+
+        return rows
+
+    @staticmethod
+    def watch(parent_repo_path, branch_name, github_token, interval=60):
+        """
+        Poll the PR dashboard and print only the rows that changed, until interrupted.
+        PRs that are merged or closed are no longer polled.
+        """
+        rows = PRStatus.report(parent_repo_path, branch_name, github_token)
+        print(f"\nWatching for changes every {interval}s, press Ctrl-C to stop.")
+
+        try:
+            while True:
+                pending = [target for target, row in rows.items() if row["state"] not in TERMINAL_STATES]
+                if not pending:
+                    print("All pull requests are merged or closed.")
+                    break
+
+                time.sleep(interval)
+                changed = []
+                for target, row in PRStatus.fetch(pending, branch_name, github_token).items():
+                    if row != rows[target]:
+                        changed.append(row)
+                        rows[target] = row
+
+                if changed:
+                    print(f"\n[{time.strftime('%H:%M:%S')}] {len(changed)} change(s):")
+                    PRStatus.print_table(changed)
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+
+        return rows
@@ -0,0 +1,120 @@
+import os
+import shlex
+import signal
+import threading
+import subprocess
+
+class Cancelled(Exception):
+    """
+    Raised when a command is started after the run was cancelled with Ctrl-C.
+    """
+
+class Process:
+    """
+    subprocess.run with a per-step timeout that kills the whole process group,
+    and cooperative cancellation of every command still in flight.
+
+    Commands run in their own session so a timeout also kills the children they spawn
+    (npm scripts, git's ssh and credential helpers). They have no controlling terminal,
+    so a prompt for credentials fails instead of hanging the run.
+    """
+
+    # Seconds per step, keyed by the program being run; override with AUTOMATION_TIMEOUT_<STEP>
+    timeouts = {"git": 600, "npm": 1800, "npx": 1800, "default": 1800}
+    cancelled = threading.Event()
+    _running = set()
+    _running_lock = threading.Lock()
+
+    @staticmethod
+    def configure(overrides):
+        """
+        Apply 'step=seconds' overrides (e.g. from --timeout git=120), on top of environment overrides.
+        """
+        for step in list(Process.timeouts):
+            value = os.environ.get(f"AUTOMATION_TIMEOUT_{step.upper()}")
+            if value:
+                Process.timeouts[step] = float(value)
+        for override in overrides or []:
+            step, _, seconds = override.partition("=")
+            if not seconds:
+                raise ValueError(f"Invalid timeout '{override}', expected STEP=SECONDS")
+            Process.timeouts[step.strip()] = float(seconds)
+
+    @staticmethod
+    def timeout_for(command):
+        """
+        Return the configured timeout for a command, based on the program it runs.
+        """
+        words = shlex.split(command) if isinstance(command, str) else list(command)
+        # Skip leading environment assignments such as NODE_OPTIONS=...
+        program = next((word for word in words if "=" not in word), "")
+        return Process.timeouts.get(os.path.basename(program), Process.timeouts["default"])
+
+    @staticmethod
+    def _kill(process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def run(command, timeout=None, check=False, input=None, capture_output=False, **kwargs):
+        """
+        Drop-in replacement for subprocess.run.
+        Raises subprocess.TimeoutExpired when the step runs past its timeout, and
+        Cancelled if the run has been cancelled.
+        """
+        if Process.cancelled.is_set():
+            raise Cancelled(f"Cancelled before running: {command}")
+
+        if timeout is None:
+            timeout = Process.timeout_for(command)
+        if capture_output:
+            kwargs["stdout"] = subprocess.PIPE
+            kwargs["stderr"] = subprocess.PIPE
+        if input is not None:
+            kwargs["stdin"] = subprocess.PIPE
+
+        process = subprocess.Popen(command, start_new_session=True, **kwargs)
+        with Process._running_lock:
+            Process._running.add(process)
+
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            Process._kill(process)
+            stdout, stderr = process.communicate()
+            raise subprocess.TimeoutExpired(command, timeout, output=stdout, stderr=stderr)
+        except BaseException:
+            # Ctrl-C never reaches the child's session, so stop it here
+            Process._kill(process)
+            process.wait()
+            raise
+        finally:
+            with Process._running_lock:
+                Process._running.discard(process)
+
+        if Process.cancelled.is_set() and process.returncode < 0:
+            raise Cancelled(f"Cancelled while running: {command}")
+
+        if check and process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command, output=stdout, stderr=stderr)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    @staticmethod
+    def cancel_all():
+        """
+        Cancel the run: kill every command in flight and refuse to start new ones.
+        """
+        Process.cancelled.set()
+        with Process._running_lock:
+            running = list(Process._running)
+        for process in running:
+            Process._kill(process)
+
+    @staticmethod
+    def reset():
+        """
+        Allow commands to run again after a cancelled action.
+        """
+        Process.cancelled.clear()
@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+# Sample categories, in the order the summary lists them
+ON_CPU = "on CPU"
+SUBPROCESS_WAIT = "waiting on subprocesses"
+OTHER_WAIT = "waiting (network, locks, input)"
+
+# Innermost frames of a thread that is blocked, used where per-thread CPU clocks are not available
+BLOCKING_FRAMES = {"select", "poll", "wait", "acquire", "_wait_for_tstate_lock", "communicate", "_communicate",
+                   "_try_wait", "readinto", "recv_into", "sleep"}
+
+class Profiler:
+    """
+    Low-overhead sampling profiler.
+    A background thread snapshots the stack of every other thread at a fixed interval and sorts each
+    sample by whether that thread used CPU since the last one, so worker threads blocked on git or npm
+    (or the menu waiting in input()) don't drown out the code that is actually running.
+    The samples are written in collapsed-stack format (one 'frame;frame;frame count' line per stack,
+    under a root frame naming the category), which flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, output_path, interval=0.005, top=20):
+        self.output_path = output_path
+        self.interval = interval
+        self.top = top
+        self.stacks = {ON_CPU: Counter(), SUBPROCESS_WAIT: Counter(), OTHER_WAIT: Counter()}
+        self.sample_count = 0
+        self._cpu_times = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+
+    @staticmethod
+    def _frame_label(frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    @staticmethod
+    def _thread_cpu_time(thread_id):
+        """
+        Return the CPU seconds a thread has used, or None where the platform cannot tell.
+        """
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+        except (AttributeError, OSError):
+            return None
+
+    def _on_cpu(self, thread_id, frame, wall_seconds):
+        cpu_time = self._thread_cpu_time(thread_id)
+        if cpu_time is None:
+            return frame.f_code.co_name not in BLOCKING_FRAMES
+        previous = self._cpu_times.get(thread_id, cpu_time)
+        self._cpu_times[thread_id] = cpu_time
+        # Busy for at least half the interval; a thread waiting on the GIL counts as waiting
+        return cpu_time - previous >= wall_seconds / 2
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                on_cpu = self._on_cpu(thread_id, frame, now - last)
+                stack = []
+                in_subprocess = False
+                while frame is not None:
+                    stack.append(self._frame_label(frame))
+                    in_subprocess = in_subprocess or os.path.basename(frame.f_code.co_filename) == "subprocess.py"
+                    frame = frame.f_back
+                category = ON_CPU if on_cpu else SUBPROCESS_WAIT if in_subprocess else OTHER_WAIT
+                self.stacks[category][";".join(reversed(stack))] += 1
+            self.sample_count += 1
+            last = now
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.write()
+        self.print_summary()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def write(self):
+        """
+        Write the collapsed stacks to the output file, each under a root frame for its category.
+        """
+        with open(self.output_path, 'w') as f:
+            for category, stacks in self.stacks.items():
+                for stack, count in stacks.most_common():
+                    f.write(f"[{category}];{stack} {count}\n")
+
+    def print_summary(self):
+        """
+        Print how thread time split between CPU and waiting, then the hottest on-CPU functions
+        by self time and by inclusive time.
+        """
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0
+        seconds_per_sample = elapsed / self.sample_count if self.sample_count else 0
+
+        print(f"\n{'='*50}")
+        print(f"PROFILE ({self.sample_count} samples over {elapsed:.1f}s)")
+        print(f"{'='*50}")
+        for category, stacks in self.stacks.items():
+            print(f"{category + ':':<34} {sum(stacks.values()) * seconds_per_sample:>8.1f} thread-seconds")
+
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.stacks[ON_CPU].items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            # Count recursive frames once per stack
+            for frame in set(frames):
+                total_counts[frame] += count
+
+        samples = sum(self.stacks[ON_CPU].values()) or 1
+        print("\nOn CPU:")
+        print(f"{'Self %':<8} {'Total %':<8} {'Function'}")
+        print(f"{'-'*8} {'-'*8} {'-'*50}")
+        for frame, count in self_counts.most_common(self.top):
+            print(f"{100 * count / samples:<8.1f} {100 * total_counts[frame] / samples:<8.1f} {frame}")
+
+        # Where workers sit waiting is still worth seeing, but apart from CPU time
+        waiting = Counter()
+        for stack, count in self.stacks[SUBPROCESS_WAIT].items():
+            # The first frame above subprocess and Process.run says which step is waiting
+            caller = next((frame for frame in reversed(stack.split(";"))
+                           if "(subprocess.py:" not in frame and "(process.py:" not in frame), stack)
+            waiting[caller] += count
+        if waiting:
+            print("\nWaiting on subprocesses, by caller:")
+            for frame, count in waiting.most_common(min(self.top, 10)):
+                print(f"{count * seconds_per_sample:>7.1f}s  {frame}")
+        print(f"\nCollapsed stacks written to: {self.output_path}")
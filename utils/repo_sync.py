@@ -0,0 +1,113 @@
+import os
+from .fleet import Fleet, DEFAULT_WORKERS
+from .process import Process
+from .run_history import RunHistory
+from .github_actions import GitHubActions
+
+class RepoSync:
+    @staticmethod
+    def list_org_repos(org_name, github_token):
+        """
+        List the repositories of a GitHub Enterprise organization.
+        Returns a dict of repo_name -> clone URL (SSH when available).
+        """
+        g = GitHubActions.get_client(github_token)
+        repos = {}
+        for repo in g.get_organization(org_name).get_repos():
+            if repo.archived:
+                continue
+            repos[repo.name] = repo.ssh_url or repo.clone_url
+        return repos
+
+    @staticmethod
+    def read_manifest(manifest_path):
+        """
+        Read a manifest file with one clone URL per line.
+        Blank lines and lines starting with '#' are ignored.
+        Returns a dict of repo_name -> clone URL.
+        """
+        repos = {}
+        with open(manifest_path, 'r') as f:
+            for line in f:
+                url = line.strip()
+                if not url or url.startswith("#"):
+                    continue
+                name = url.rstrip("/").split("/")[-1].split(":")[-1]
+                if name.endswith(".git"):
+                    name = name[:-4]
+                repos[name] = url
+        return repos
+
+    @staticmethod
+    def update_reference_repo(reference_path, repos):
+        """
+        Create or refresh a bare reference repository holding the objects of every repo,
+        so clones can borrow objects from it instead of duplicating them on disk.
+        """
+        if not os.path.isdir(reference_path):
+            Process.run(["git", "init", "--quiet", "--bare", reference_path], check=True)
+
+        existing = Process.run(["git", "remote"], cwd=reference_path,
+                               capture_output=True, text=True, check=True).stdout.split()
+        for name, url in repos.items():
+            if name not in existing:
+                Process.run(["git", "remote", "add", name, url], cwd=reference_path, check=True)
+
+        # One process fetching all remotes, parallelised by git itself
+        Process.run(["git", "fetch", "--quiet", "--all", "--prune", f"--jobs={DEFAULT_WORKERS}"],
+                    cwd=reference_path, check=True)
+        print(f"Reference repository updated at {reference_path}")
+
+    @staticmethod
+    def sync_repo(repo_path, url, reference_path=None):
+        """
+        Clone a missing repository as a blobless partial clone, or fast-forward an existing one
+        with a single fetch. Returns a short status string.
+        """
+        if not os.path.isdir(os.path.join(repo_path, ".git")):
+            command = ["git", "clone", "--quiet", "--filter=blob:none"]
+            if reference_path:
+                command += ["--reference-if-able", reference_path]
+            command += [url, repo_path]
+            result = Process.run(command, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"Error cloning {url}: {result.stderr.strip()}")
+                return "failed"
+            return "cloned"
+
+        result = Process.run(["git", "fetch", "--quiet", "--prune", "origin"],
+                             cwd=repo_path, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"Error fetching {repo_path}: {result.stderr.strip()}")
+            return "failed"
+
+        # Only fast-forward branches that track a remote branch
+        upstream = Process.run(["git", "rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"],
+                               cwd=repo_path, capture_output=True, text=True)
+        if upstream.returncode != 0:
+            return "fetched"
+
+        result = Process.run(["git", "merge", "--quiet", "--ff-only", "@{u}"],
+                             cwd=repo_path, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"Could not fast-forward {repo_path}: {result.stderr.strip()}")
+            return "diverged"
+        return "updated"
+
+    @staticmethod
+    def sync(parent_repo_path, repos, reference_path=None, workers=DEFAULT_WORKERS, report=None):
+        """
+        Clone or update every repository in 'repos' (repo_name -> URL) under the parent folder in parallel.
+        Returns a dict of repo_path -> status.
+        """
+        urls = {os.path.join(parent_repo_path, name): url for name, url in repos.items()}
+        history = RunHistory("sync")
+        results = Fleet.run_parallel(
+            list(urls),
+            lambda repo_path: RepoSync.sync_repo(repo_path, urls[repo_path], reference_path),
+            workers=workers,
+            report=report,
+            history=history
+        )
+        history.print_summary()
+        return {repo_path: status or "failed" for repo_path, status in results.items()}
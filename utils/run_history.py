@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import statistics
+import threading
+import subprocess
+from .cache import Cache
+
+class RunHistory:
+    """
+    Remembers how long an action took in each repository, so runs can start the slowest
+    repositories first (longest-expected-first) and keep the worker pool busy until the end.
+    """
+
+    # Weight of the newest run in the moving average
+    smoothing = 0.5
+    # Seconds assumed for a repository when nothing has been recorded for this action yet
+    default_seconds = 60.0
+
+    def __init__(self, action):
+        self.action = action
+        self.path = os.path.join(Cache.path("history"), f"{action}.json")
+        self.actual = {}
+        self.predicted = {}
+        self._lock = threading.Lock()
+        self._started_at = None
+        try:
+            with open(self.path, 'r') as f:
+                self.durations = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.durations = {}
+
+    def predict(self, repo_path):
+        """
+        Return the expected duration of the action in a repository. Unseen repositories get the
+        median of the known ones, so they neither jump the queue nor get left for last.
+        """
+        if repo_path in self.durations:
+            return self.durations[repo_path]
+        if self.durations:
+            return statistics.median(self.durations.values())
+        return RunHistory.default_seconds
+
+    def order(self, repo_paths):
+        """
+        Return the repositories sorted longest-expected-first.
+        """
+        self.predicted = {repo_path: self.predict(repo_path) for repo_path in repo_paths}
+        self._started_at = time.perf_counter()
+        return sorted(repo_paths, key=lambda repo_path: -self.predicted[repo_path])
+
+    def timed(self, action):
+        """
+        Wrap 'action(repo_path)' so its duration is recorded when it returns. A timeout records at
+        least the timeout, since the full run takes longer; failed or cancelled runs are not recorded,
+        as their partial time says nothing about how long the repository takes.
+        """
+        def run(repo_path):
+            started_at = time.perf_counter()
+            try:
+                result = action(repo_path)
+            except subprocess.TimeoutExpired as e:
+                self.record(repo_path, max(time.perf_counter() - started_at, e.timeout or 0))
+                raise
+            self.record(repo_path, time.perf_counter() - started_at)
+            return result
+        return run
+
+    def record(self, repo_path, seconds):
+        with self._lock:
+            self.actual[repo_path] = seconds
+            previous = self.durations.get(repo_path)
+            if previous is None:
+                self.durations[repo_path] = seconds
+            else:
+                self.durations[repo_path] = RunHistory.smoothing * seconds + (1 - RunHistory.smoothing) * previous
+
+    def save(self):
+        temp_path = f"{self.path}.tmp{os.getpid()}"
+        with open(temp_path, 'w') as f:
+            json.dump(self.durations, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def print_summary(self, top=5):
+        """
+        Print predicted against actual time for the run and its slowest repositories.
+        """
+        if not self.actual:
+            return
+        wall_clock = time.perf_counter() - self._started_at if self._started_at else 0
+        predicted_total = sum(self.predicted.get(repo_path, 0) for repo_path in self.actual)
+        actual_total = sum(self.actual.values())
+
+        print(f"\nTiming ({self.action}): predicted {predicted_total:.1f}s of work, actual {actual_total:.1f}s, "
+              f"wall clock {wall_clock:.1f}s")
+        print(f"{'Repository':<40} {'Predicted':<10} {'Actual'}")
+        print(f"{'-'*40} {'-'*10} {'-'*10}")
+        for repo_path in sorted(self.actual, key=lambda path: -self.actual[path])[:top]:
+            predicted = self.predicted.get(repo_path)
+            predicted = f"{predicted:.1f}s" if predicted is not None else "-"
+            print(f"{os.path.basename(repo_path):<40} {predicted:<10} {self.actual[repo_path]:.1f}s")
@@ -0,0 +1,165 @@
+import re
+
+VERSION_RE = re.compile(r"^\s*[v=]?\s*(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?\s*$")
+PARTIAL_RE = re.compile(r"^[v=]?(\d+|[xX*])?(?:\.(\d+|[xX*]))?(?:\.(\d+|[xX*]))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$")
+COMPARATOR_RE = re.compile(r"^(<=|>=|<|>|=|\^|~>|~)?(.*)$")
+
+class Semver:
+    """
+    The subset of node-semver needed to resolve npm version ranges:
+    exact versions, comparators, ^, ~, x-ranges, hyphen ranges and '||'.
+    """
+
+    @staticmethod
+    def _prerelease_key(prerelease):
+        parts = []
+        for part in prerelease.split("."):
+            parts.append((0, int(part), "") if part.isdigit() else (1, 0, part))
+        return tuple(parts)
+
+    @staticmethod
+    def parse(version):
+        """
+        Return a sortable key for a full version string, or None if it is not valid semver.
+        Releases sort after their prereleases.
+        """
+        match = VERSION_RE.match(version)
+        if not match:
+            return None
+        major, minor, patch, prerelease = match.groups()
+        if prerelease is None:
+            return (int(major), int(minor), int(patch), 1, ())
+        return (int(major), int(minor), int(patch), 0, Semver._prerelease_key(prerelease))
+
+    @staticmethod
+    def _lowest(major, minor, patch):
+        # The '-0' prerelease sorts before every other version with the same numbers
+        return (major, minor, patch, 0, ((0, 0, ""),))
+
+    @staticmethod
+    def _comparators(text):
+        """
+        Desugar one space-separated comparator set into a list of (operator, key, explicit_prerelease_base).
+        """
+        text = re.sub(r"(<=|>=|<|>|=|\^|~>|~)\s+", r"\1", text.strip())
+
+        hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", text)
+        if hyphen:
+            low = Semver._comparators(f">={hyphen.group(1)}")
+            high_partial = PARTIAL_RE.match(hyphen.group(2))
+            if not high_partial:
+                raise ValueError(f"Invalid range: {text}")
+            major, minor, patch, prerelease = high_partial.groups()
+            if patch is not None and patch not in "xX*":
+                high = Semver._comparators(f"<={hyphen.group(2)}")
+            elif minor is not None and minor not in "xX*":
+                high = [("<", Semver._lowest(int(major), int(minor) + 1, 0), None)]
+            elif major is not None and major not in "xX*":
+                high = [("<", Semver._lowest(int(major) + 1, 0, 0), None)]
+            else:
+                high = []
+            return low + high
+
+        comparators = []
+        for token in text.split():
+            operator, version = COMPARATOR_RE.match(token).groups()
+            operator = "~" if operator == "~>" else (operator or "")
+            partial = PARTIAL_RE.match(version)
+            if not partial:
+                raise ValueError(f"Invalid range: {text}")
+            major, minor, patch, prerelease = partial.groups()
+            wild = lambda part: part is None or part in "xX*"
+            explicit = None
+
+            if wild(major):
+                if operator in ("<", ">"):
+                    comparators.append(("<", Semver._lowest(0, 0, 0), None))  # Matches nothing
+                continue
+
+            major = int(major)
+            minor = None if wild(minor) else int(minor)
+            patch = None if wild(patch) or minor is None else int(patch)
+            if patch is not None and prerelease:
+                key = (major, minor, patch, 0, Semver._prerelease_key(prerelease))
+                explicit = (major, minor, patch)
+            elif patch is not None:
+                key = (major, minor, patch, 1, ())
+            else:
+                key = Semver._lowest(major, minor or 0, 0)
+
+            if operator == "^":
+                if major > 0 or minor is None:
+                    upper = Semver._lowest(major + 1, 0, 0)
+                elif minor > 0 or patch is None:
+                    upper = Semver._lowest(0, minor + 1, 0)
+                else:
+                    upper = Semver._lowest(0, 0, patch + 1)
+                comparators += [(">=", key, explicit), ("<", upper, None)]
+            elif operator == "~":
+                upper = Semver._lowest(major + 1, 0, 0) if minor is None else Semver._lowest(major, minor + 1, 0)
+                comparators += [(">=", key, explicit), ("<", upper, None)]
+            elif patch is not None:
+                comparators.append((operator or "=", key, explicit))
+            else:
+                # Partial version: the range covers every patch (and minor) of it
+                upper = Semver._lowest(major + 1, 0, 0) if minor is None else Semver._lowest(major, minor + 1, 0)
+                if operator in ("", "="):
+                    comparators += [(">=", key, None), ("<", upper, None)]
+                elif operator == ">":
+                    comparators.append((">=", upper, None))
+                elif operator == ">=":
+                    comparators.append((">=", key, None))
+                elif operator == "<":
+                    comparators.append(("<", key, None))
+                elif operator == "<=":
+                    comparators.append(("<", upper, None))
+        return comparators
+
+    @staticmethod
+    def parse_range(version_range):
+        """
+        Parse an npm range into a list of comparator sets (any one set must match).
+        Raises ValueError for ranges that are not semver (tags, URLs, file: paths).
+        """
+        return [Semver._comparators(part) for part in version_range.split("||")]
+
+    @staticmethod
+    def _matches(key, comparator_set):
+        for operator, bound, _ in comparator_set:
+            if operator == "=" and key != bound:
+                return False
+            if operator == ">=" and key < bound:
+                return False
+            if operator == ">" and key <= bound:
+                return False
+            if operator == "<=" and key > bound:
+                return False
+            if operator == "<" and key >= bound:
+                return False
+        # Prereleases only match when the range names a prerelease of the same version
+        if key[3] == 0:
+            return any(explicit == key[:3] for _, _, explicit in comparator_set)
+        return True
+
+    @staticmethod
+    def satisfies(version, version_range):
+        key = Semver.parse(version)
+        if key is None:
+            return False
+        return any(Semver._matches(key, comparator_set) for comparator_set in Semver.parse_range(version_range))
+
+    @staticmethod
+    def max_satisfying(versions, version_range):
+        """
+        Return the highest version satisfying the range, or None.
+        """
+        comparator_sets = Semver.parse_range(version_range)
+        best = None
+        best_key = None
+        for version in versions:
+            key = Semver.parse(version)
+            if key is None or (best_key is not None and key <= best_key):
+                continue
+            if any(Semver._matches(key, comparator_set) for comparator_set in comparator_sets):
+                best, best_key = version, key
+        return best
@@ -0,0 +1,93 @@
+import os
+import shlex
+import tempfile
+import subprocess
+from . import github_actions
+from .process import Process
+
+class SSHMultiplexer:
+    """
+    Shares one SSH control-master connection to the GitHub Enterprise host across every
+    git subprocess of a run, by pointing GIT_SSH_COMMAND at its control socket.
+    The master lives until stop(); git's ssh only ever joins it, and connects directly
+    if it has gone away, so a git command never becomes a backgrounded master itself.
+    """
+
+    def __init__(self, host=None, user="git"):
+        self.host = host or github_actions.GITHUB_API_URL.split("//")[-1].split("/")[0]
+        self.user = user
+        self._socket_dir = None
+        self._control_path = None
+        self._previous_ssh_command = None
+        self.active = False
+
+    def _ssh_options(self, master=False):
+        if master:
+            return ["-o", "ControlMaster=yes", "-o", f"ControlPath={self._control_path}", "-o", "ControlPersist=yes"]
+        return ["-o", "ControlMaster=no", "-o", f"ControlPath={self._control_path}"]
+
+    def start(self):
+        """
+        Open the master connection and export GIT_SSH_COMMAND.
+        Returns False (leaving git untouched) if the connection cannot be set up.
+        """
+        # Socket paths are limited to ~100 characters, so keep them short
+        self._socket_dir = tempfile.mkdtemp(prefix="gitmux-")
+        self._control_path = os.path.join(self._socket_dir, "%C")
+
+        # The backgrounded master keeps stderr open, so collect it in a file rather than a pipe
+        with tempfile.TemporaryFile(mode="w+") as errors:
+            try:
+                result = Process.run(["ssh", "-f", "-N", "-o", "BatchMode=yes"] + self._ssh_options(master=True)
+                                     + [f"{self.user}@{self.host}"], stdout=subprocess.DEVNULL, stderr=errors,
+                                     timeout=60)
+                returncode = result.returncode
+            except subprocess.TimeoutExpired:
+                returncode = None
+            errors.seek(0)
+            message = errors.read().strip() or "timed out"
+
+        if returncode != 0:
+            print(f"Could not open a shared SSH connection to {self.host}, "
+                  f"git will connect per command: {message}")
+            os.rmdir(self._socket_dir)
+            return False
+
+        self._previous_ssh_command = os.environ.get("GIT_SSH_COMMAND")
+        base_command = self._previous_ssh_command or "ssh"
+        os.environ["GIT_SSH_COMMAND"] = " ".join([base_command] + [shlex.quote(option) for option in self._ssh_options()])
+        self.active = True
+        return True
+
+    def stop(self):
+        """
+        Close the master connection and restore GIT_SSH_COMMAND.
+        """
+        if not self.active:
+            return
+
+        # Not through Process.run, which refuses to start anything once a run was cancelled
+        try:
+            subprocess.run(["ssh", "-O", "exit", "-o", f"ControlPath={self._control_path}",
+                            f"{self.user}@{self.host}"], capture_output=True, timeout=15)
+        except (subprocess.TimeoutExpired, OSError):
+            # A master that will not exit must not keep the menu from closing
+            pass
+
+        if self._previous_ssh_command is None:
+            os.environ.pop("GIT_SSH_COMMAND", None)
+        else:
+            os.environ["GIT_SSH_COMMAND"] = self._previous_ssh_command
+
+        for name in os.listdir(self._socket_dir):
+            os.remove(os.path.join(self._socket_dir, name))
+        os.rmdir(self._socket_dir)
+        self.active = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
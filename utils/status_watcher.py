@@ -0,0 +1,187 @@
+import os
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+import threading
+from .fleet import Fleet
+from .process import Process
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+# Files directly under .git whose changes affect branch, ahead/behind or dirty state
+GIT_DIR_FILES = {"HEAD", "index", "packed-refs"}
+
+class StatusIndex:
+    """
+    In-memory index of branch, ahead/behind and dirty state for every repository under a folder.
+    An optional inotify watcher on .git/HEAD, .git/index and the refs keeps it current,
+    recomputing status only for the repositories that had events.
+    Worktree edits are not watched, so 'dirty' can lag until something is staged or committed;
+    use it for display, not to decide which repositories to skip.
+    """
+
+    def __init__(self, parent_repo_path, debounce=0.2):
+        self.parent_repo_path = parent_repo_path
+        self.debounce = debounce
+        self.index = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._fd = None
+        self._watches = {}  # watch descriptor -> (repo_path, directory)
+        self._libc = None
+
+    @staticmethod
+    def compute_status(repo_path):
+        """
+        Return the branch, upstream, ahead/behind counts and dirty flag of a repository.
+        """
+        # --no-optional-locks keeps status from rewriting .git/index, which would re-trigger the watcher
+        result = Process.run(["git", "--no-optional-locks", "status", "--porcelain=v2", "--branch"],
+                             cwd=repo_path, capture_output=True, text=True, check=True)
+        status = {"branch": None, "upstream": None, "ahead": 0, "behind": 0, "dirty": False}
+        for line in result.stdout.splitlines():
+            if line.startswith("# branch.head "):
+                status["branch"] = line.split(" ", 2)[2]
+            elif line.startswith("# branch.upstream "):
+                status["upstream"] = line.split(" ", 2)[2]
+            elif line.startswith("# branch.ab "):
+                ahead, behind = line.split(" ")[2:4]
+                status["ahead"], status["behind"] = int(ahead), -int(behind)
+            elif not line.startswith("#"):
+                status["dirty"] = True
+        status["updated_at"] = time.time()
+        return status
+
+    def refresh(self, repo_paths=None):
+        """
+        Recompute the status of the given repositories (all of them by default) in parallel.
+        """
+        if repo_paths is None:
+            repo_paths = Fleet.list_repos(self.parent_repo_path)
+        results = Fleet.run_parallel(repo_paths, StatusIndex.compute_status)
+        with self._lock:
+            for repo_path, status in results.items():
+                if status:
+                    self.index[repo_path] = status
+
+    def get(self, repo_path):
+        """
+        Return the last known status of a repository, or None if it is not indexed.
+        """
+        with self._lock:
+            return self.index.get(repo_path)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.index)
+
+    def summary(self):
+        """
+        Return a one-line summary of the indexed repositories.
+        """
+        statuses = self.snapshot().values()
+        dirty = sum(1 for status in statuses if status["dirty"])
+        ahead = sum(1 for status in statuses if status["ahead"])
+        behind = sum(1 for status in statuses if status["behind"])
+        return f"{len(statuses)} repos: {dirty} dirty, {ahead} ahead, {behind} behind"
+
+    def _add_watch(self, repo_path, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = (repo_path, directory)
+
+    def _watch_repo(self, repo_path):
+        git_dir = os.path.join(repo_path, ".git")
+        self._add_watch(repo_path, git_dir)
+        for refs_dir in ("heads", "remotes"):
+            for root, dirs, files in os.walk(os.path.join(git_dir, "refs", refs_dir)):
+                self._add_watch(repo_path, root)
+
+    def start(self):
+        """
+        Build the index and start the inotify watcher.
+        Returns False if inotify is not available, in which case the index is only built once.
+        """
+        self.refresh()
+
+        library = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(library, use_errno=True) if library else None
+        if libc is None or not hasattr(libc, "inotify_init1"):
+            print("inotify is not available on this system, repository status will not update automatically.")
+            return False
+
+        self._libc = libc
+        self._fd = libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            print(f"Could not start the status watcher: {os.strerror(ctypes.get_errno())}")
+            return False
+
+        for repo_path in self.snapshot():
+            self._watch_repo(repo_path)
+
+        self._thread = threading.Thread(target=self._run, name="status-watcher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read_events(self):
+        """
+        Read pending inotify events and return the repositories they belong to.
+        """
+        changed = set()
+        buffer = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + name_length].rstrip(b"\0").decode(errors="replace")
+            offset += name_length
+
+            if wd not in self._watches:
+                continue
+            repo_path, directory = self._watches[wd]
+
+            # New ref namespaces (e.g. refs/heads/feature/) need their own watch
+            if mask & IN_ISDIR and mask & IN_CREATE and directory != os.path.join(repo_path, ".git"):
+                self._add_watch(repo_path, os.path.join(directory, name))
+
+            if directory == os.path.join(repo_path, ".git") and name not in GIT_DIR_FILES:
+                continue
+            changed.add(repo_path)
+        return changed
+
+    def _run(self):
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.5)
+            if not readable:
+                continue
+
+            # Collect a burst of events (git writes several files per operation) before recomputing
+            changed = self._read_events()
+            deadline = time.monotonic() + self.debounce
+            while time.monotonic() < deadline:
+                readable, _, _ = select.select([self._fd], [], [], max(0, deadline - time.monotonic()))
+                if readable:
+                    changed |= self._read_events()
+
+            if changed:
+                self.refresh(sorted(changed))